@@ -0,0 +1,46 @@
+import time
+
+from slitherlink import Grid
+from slitherlink import sat
+
+# 1x1
+# puzzle_input = {(0, 0): 4}
+# HEIGHT = 1
+# WIDTH = 1
+
+# 2x2
+puzzle_input = {(0, 0): 3, (1, 0): 2, (1, 1): 3}
+HEIGHT = 2
+WIDTH = 2
+
+# Set to a file name to also write the CNF in DIMACS format
+DIMACS_PATH = None
+
+# Require a single loop (standard Slitherlink) instead of allowing several
+SINGLE_LOOP = False
+
+
+if __name__ == "__main__":
+    start_time = time.perf_counter()
+
+    grid = Grid(HEIGHT, WIDTH)
+    grid.check_clues(puzzle_input)
+
+    if DIMACS_PATH:
+        with open(DIMACS_PATH, "w") as f:
+            f.write(sat.encode(grid, puzzle_input).to_dimacs())
+
+    on_edges = sat.solve(grid, puzzle_input, single_loop=SINGLE_LOOP)
+
+    print("Solved" if on_edges else "No Plan Found")
+
+    end_time = time.perf_counter()
+    elapsed_time = end_time - start_time
+    print(f"Elapsed time: {elapsed_time:.4f} seconds")
+
+    if on_edges:
+        for e in sorted(on_edges):
+            print(f"Draw {grid.edge_names[e]}")
+        grid.print_ascii(on_edges, puzzle_input)
+    else:
+        print("No plan found.")
@@ -0,0 +1,10 @@
+"""Slitherlink grid model and solver engines.
+
+Engines take a Grid and a clue dict {(row, col): count} and work on integer
+edge ids; only the prover-backed ones (Spectra, BFS verification) import
+ShadowProver.
+"""
+
+from .grid import Grid, parse_clues
+
+__all__ = ["Grid", "parse_clues"]
@@ -0,0 +1,166 @@
+"""Depth-first search with unit propagation on clue and vertex constraints."""
+
+UNKNOWN, OFF, ON = -1, 0, 1
+
+
+def build_constraints(grid, clues):
+    # Each constraint is (edge ids, allowed number of On edges)
+    constraints = []
+
+    # Clue cells: exactly `count` of the 4 edges are On
+    for (r_i, c_i), count in clues.items():
+        constraints.append((list(grid.edges_of_cell(grid.cell(r_i, c_i))), (count,)))
+
+    # Vertices: degree 0 or 2
+    for p in range(grid.num_vertices):
+        constraints.append((list(grid.edges_at_vertex(p)), (0, 2)))
+
+    # Every loop crosses a row of vertical edges (or a column of horizontal
+    # edges) an even number of times. These are implied by the constraints
+    # above but let propagation catch an unclosable line long before the
+    # search reaches the far side of the board.
+    height, width = grid.height, grid.width
+    for r_i in range(height):
+        row = [grid.v(r_i, c_i) for c_i in range(width + 1)]
+        constraints.append((row, tuple(range(0, width + 2, 2))))
+    for c_i in range(width):
+        column = [grid.h(r_i, c_i) for r_i in range(height + 1)]
+        constraints.append((column, tuple(range(0, height + 2, 2))))
+
+    return constraints
+
+
+def build_watches(grid, constraints):
+    # Constraint indices that mention each edge
+    watches = [[] for _ in range(grid.num_edges)]
+    for ci, (edge_ids, _) in enumerate(constraints):
+        for e in edge_ids:
+            watches[e].append(ci)
+    return watches
+
+
+def sweep_order(grid):
+    # Row by row, each line of horizontals followed by the verticals below it,
+    # so a conflict is found close to the decisions that caused it.
+    order = []
+    for r_i in range(grid.height + 1):
+        order.extend(grid.h(r_i, c_i) for c_i in range(grid.width))
+        if r_i < grid.height:
+            order.extend(grid.v(r_i, c_i) for c_i in range(grid.width + 1))
+    return order
+
+
+def propagate(values, trail, pending, constraints, watches):
+    """Apply forced assignments until fixpoint. Returns False on a conflict."""
+    while pending:
+        ci = pending.pop()
+        edge_ids, allowed = constraints[ci]
+
+        on = 0
+        unknown = []
+        for e in edge_ids:
+            if values[e] == ON:
+                on += 1
+            elif values[e] == UNKNOWN:
+                unknown.append(e)
+
+        feasible = [k for k in allowed if on <= k <= on + len(unknown)]
+        if not feasible:
+            return False
+        if not unknown:
+            continue
+
+        if max(feasible) == on:
+            forced = OFF
+        elif min(feasible) == on + len(unknown):
+            forced = ON
+        else:
+            continue
+
+        for e in unknown:
+            values[e] = forced
+            trail.append(e)
+            pending.update(watches[e])
+
+    return True
+
+
+def search(grid, clues, stats=None):
+    """Yield the edge values list at every complete, non-empty assignment.
+
+    The same list is updated in place as the search continues, so copy it
+    before resuming the generator. stats, if given, is a dict that gets
+    "decisions" and "conflicts" counts.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("decisions", 0)
+    stats.setdefault("conflicts", 0)
+
+    constraints = build_constraints(grid, clues)
+    watches = build_watches(grid, constraints)
+
+    order = sweep_order(grid)
+    values = [UNKNOWN] * grid.num_edges
+    trail = []
+
+    if not propagate(values, trail, set(range(len(constraints))), constraints, watches):
+        return
+
+    # Each entry is (trail length before the decision, edge, values left to try)
+    stack = []
+    while True:
+        e = next((i for i in order if values[i] == UNKNOWN), None)
+        if e is None:
+            # The empty drawing is not a solution
+            if ON in values:
+                yield values
+        else:
+            stack.append((len(trail), e, [OFF, ON]))
+
+        # Try the next value of the most recent decision, backtracking as needed
+        while stack:
+            trail_len, e, options = stack[-1]
+            while len(trail) > trail_len:
+                values[trail.pop()] = UNKNOWN
+            if not options:
+                stack.pop()
+                continue
+
+            values[e] = options.pop()
+            trail.append(e)
+            stats["decisions"] += 1
+            if propagate(values, trail, set(watches[e]), constraints, watches):
+                break
+            stats["conflicts"] += 1
+        else:
+            return
+
+
+def iter_solutions(grid, clues, stats=None):
+    """Yield every solution as a set of on-edge ids."""
+    for values in search(grid, clues, stats):
+        yield {i for i, value in enumerate(values) if value == ON}
+
+
+def count_solutions(grid, clues, limit=None, stats=None):
+    """Number of solutions, stopping early once it reaches limit."""
+    count = 0
+    for _ in search(grid, clues, stats):
+        count += 1
+        if count == limit:
+            break
+    return count
+
+
+def is_unique(grid, clues, stats=None):
+    """Whether the clues have exactly one solution, stopping at the second."""
+    return count_solutions(grid, clues, limit=2, stats=stats) == 1
+
+
+def solve(grid, clues, stats=None):
+    """Set of on-edge ids satisfying every clue and vertex, or None.
+
+    stats, if given, is a dict that gets "decisions" and "conflicts" counts.
+    """
+    return next(iter_solutions(grid, clues, stats), None)
@@ -0,0 +1,117 @@
+"""Benchmark every engine on the puzzles from the README's Tested Puzzles table.
+
+    python -m slitherlink.bench --repeat 5 --output bench_results.json
+
+Each engine is run with warmup and repetitions per puzzle. The results file
+records wall times alongside the engine's own counters (states expanded,
+prover calls, ...) and the README's hand-measured times, with stable key
+order so runs can be diffed between commits.
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import time
+
+from .engines import ENGINES
+from .grid import Grid
+
+# (name, height, width, clues, README seconds per engine). The README's BFS
+# times were taken with fol_prove goal checks, so they go with bfs-prover.
+PUZZLES = [
+    ("1x1 4", 1, 1, {(0, 0): 4}, {"bfs-prover": 0.1, "spectra": 2.5}),
+    ("1x2 1 4", 1, 2, {(0, 0): 1, (0, 1): 4}, {"bfs-prover": 0.6, "spectra": 45.8}),
+    ("1x2 3 3", 1, 2, {(0, 0): 3, (0, 1): 3}, {"bfs-prover": 0.8, "spectra": 69.3}),
+    ("2x1 1/4", 2, 1, {(0, 0): 1, (1, 0): 4}, {"bfs-prover": 5.1, "spectra": 37.9}),
+    ("2x1 3/3", 2, 1, {(0, 0): 3, (1, 0): 3}, {"bfs-prover": 1.0, "spectra": 67.3}),
+    ("2x2 4", 2, 2, {(0, 0): 4}, {"bfs-prover": 3.6, "spectra": 752.9}),
+    ("2x2 4/0", 2, 2, {(0, 0): 4, (1, 1): 0}, {"bfs-prover": 3.4, "spectra": 399.5}),
+    ("2x2 3/2 3", 2, 2, {(0, 0): 3, (1, 0): 2, (1, 1): 3}, {"bfs-prover": 105.9}),
+]
+
+
+# Presolve alone settles most of these puzzles, so these engines are timed
+# without it to measure their search; the "-presolve" entries time their
+# defaults. name -> (engine, keyword options)
+PRESOLVE_ENGINES = ("bfs", "bfs-prover", "spectra", "spectra-cnf")
+BENCH_ENGINES = {}
+for _name, _solve in ENGINES.items():
+    if _name in PRESOLVE_ENGINES:
+        BENCH_ENGINES[_name] = (_solve, {"presolve": False})
+        BENCH_ENGINES[f"{_name}-presolve"] = (_solve, {})
+    else:
+        BENCH_ENGINES[_name] = (_solve, {})
+
+
+def run_one(engine, grid, clues, warmup, repeat):
+    solve, options = BENCH_ENGINES[engine]
+    for _ in range(warmup):
+        solve(grid, clues, **options)
+
+    times = []
+    for _ in range(repeat):
+        stats = {}
+        start_time = time.perf_counter()
+        on_edges = solve(grid, clues, stats=stats, **options)
+        times.append(time.perf_counter() - start_time)
+
+    return {
+        "solved": bool(on_edges),
+        "edges": sorted(grid.names(on_edges)) if on_edges else [],
+        "seconds_min": round(min(times), 6),
+        "seconds_median": round(statistics.median(times), 6),
+        "seconds": [round(t, 6) for t in times],
+        "stats": stats,
+    }
+
+
+def run(engines, warmup=1, repeat=3, puzzles=PUZZLES):
+    results = {
+        "python": platform.python_version(),
+        "warmup": warmup,
+        "repeat": repeat,
+        "puzzles": {},
+    }
+    for name, height, width, clues, readme in puzzles:
+        grid = Grid(height, width)
+        entry = {
+            "height": height,
+            "width": width,
+            "clues": [[r, c, k] for (r, c), k in sorted(clues.items())],
+            "readme_seconds": readme,
+            "engines": {},
+        }
+        for engine in engines:
+            try:
+                entry["engines"][engine] = run_one(engine, grid, clues, warmup, repeat)
+            except ImportError as e:
+                # The prover-backed engines need ShadowProver installed
+                entry["engines"][engine] = {"skipped": f"{type(e).__name__}: {e}"}
+            print(name, engine, entry["engines"][engine].get("seconds_min", "skipped"))
+        results["puzzles"][name] = entry
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m slitherlink.bench")
+    parser.add_argument(
+        "--engine",
+        action="append",
+        choices=sorted(BENCH_ENGINES),
+        help="engine to run (repeatable, default all)",
+    )
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", "-o", default="bench_results.json")
+    args = parser.parse_args(argv)
+
+    results = run(args.engine or list(BENCH_ENGINES), args.warmup, args.repeat)
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    print(f"Wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
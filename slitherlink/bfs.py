@@ -0,0 +1,466 @@
+"""Breadth-first search over "Draw e" plans, as in nxnbfs.py.
+
+States are integer bitmasks over grid edge ids: bit e is set when edge e is On.
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+
+from .backtrack import ON, UNKNOWN
+from .dispatch import Dispatcher
+from .formulas import dnf_goal
+from .grid import Grid
+from .presolve import deduce
+from .prover import EdgeFormulas, ProverPool, shadowprover
+from .symmetry import automorphisms, mask_permuter
+
+# Smallest slice of a layer sent to one worker in solve_layers
+LAYER_CHUNK = 512
+
+
+def goal_masks(grid, clues):
+    # Bitmask of each clue cell's 4 edges, and of the edges touching each vertex
+    clue_masks = [
+        (grid.edge_mask(grid.edges_of_cell(grid.cell(r, c))), count)
+        for (r, c), count in clues.items()
+    ]
+    vertex_masks = [
+        grid.edge_mask(grid.edges_at_vertex(p)) for p in range(grid.num_vertices)
+    ]
+    return clue_masks, vertex_masks
+
+
+def satisfies_goal(mask, clue_masks, vertex_masks):
+    for cell_mask, count in clue_masks:
+        if (mask & cell_mask).bit_count() != count:
+            return False
+    for vertex_mask in vertex_masks:
+        if (mask & vertex_mask).bit_count() not in (0, 2):
+            return False
+    return True
+
+
+class BestFirstQueue:
+    """Drop-in for the BFS deque that pops the state with the smallest
+    drawn edges + ceil(clue deficit / 2), preferring more drawn edges on ties.
+
+    One edge touches at most two cells, so each drawn edge lowers the total
+    clue deficit by at most 2 and the estimate never overshoots; the first
+    goal state popped is still a shortest plan.
+    """
+
+    __slots__ = ("clue_masks", "heap", "order")
+
+    def __init__(self, clue_masks):
+        self.clue_masks = clue_masks
+        self.heap = []
+        self.order = itertools.count()
+
+    def __len__(self):
+        return len(self.heap)
+
+    def append(self, entry):
+        state = entry[0]
+        drawn = state.bit_count()
+        deficit = 0
+        for cell_mask, count in self.clue_masks:
+            deficit += max(0, count - (state & cell_mask).bit_count())
+        priority = drawn + (deficit + 1) // 2
+        heapq.heappush(self.heap, (priority, -drawn, next(self.order), entry))
+
+    def extend(self, entries):
+        for entry in entries:
+            self.append(entry)
+
+    def popleft(self):
+        return heapq.heappop(self.heap)[-1]
+
+
+def search_space(grid, clues, presolve=True, break_symmetry=True):
+    """(start state, free edge ids, automorphism edge permutations), or None
+    when presolve shows there is no solution."""
+    if presolve:
+        values = deduce(grid, clues)
+        if values is None:
+            return None
+        start = grid.edge_mask(e for e, value in enumerate(values) if value == ON)
+        free = [e for e, value in enumerate(values) if value == UNKNOWN]
+    else:
+        start = 0
+        free = list(range(grid.num_edges))
+
+    # The rules behind presolve are symmetric, so start and free are closed
+    # under the board's automorphisms.
+    perms = automorphisms(grid, clues) if break_symmetry else []
+    return start, free, perms
+
+
+def edge_limits(grid, clues, free):
+    """For each position in free, (mask, most On edges) pairs for the clue
+    cells and vertices that edge touches.
+
+    Drawing only adds edges, so a state over one of these limits can never
+    reach the goal.
+    """
+    limits = [[] for _ in free]
+    position = {e: i for i, e in enumerate(free)}
+    for (r, c), count in clues.items():
+        edges = grid.edges_of_cell(grid.cell(r, c))
+        cell_mask = grid.edge_mask(edges)
+        for e in edges:
+            if e in position:
+                limits[position[e]].append((cell_mask, count))
+    for p in range(grid.num_vertices):
+        edges = grid.edges_at_vertex(p)
+        vertex_mask = grid.edge_mask(edges)
+        for e in edges:
+            if e in position:
+                limits[position[e]].append((vertex_mask, 2))
+    return limits
+
+
+def successors(state, last, free, permuters, limits=None):
+    """(successor, position in free of the edge drawn) pairs of a state.
+
+    Without permuters only edges after position last are drawn, so every
+    edge subset is reached exactly once. With permuters any undrawn edge is,
+    and each successor is replaced by the leader of its orbit (smallest
+    bitmask) with position -1; unvisited deduplicates those. With limits (see
+    edge_limits), successors that overfill a clue cell or give a vertex a
+    third edge are dropped, checking only what the drawn edge touches.
+    """
+    for i in range(last + 1, len(free)):
+        bit = 1 << free[i]
+        if state & bit:
+            continue
+        successor = state | bit
+        if limits is not None and any(
+            (successor & mask).bit_count() > most for mask, most in limits[i]
+        ):
+            continue
+        if not permuters:
+            yield successor, i
+            continue
+        yield min([successor] + [permute(successor) for permute in permuters]), -1
+
+
+def unvisited(entries, seen):
+    """The (state, last) entries whose state is not in seen yet, adding them
+    to it. seen is None without symmetry breaking, where successors never
+    reaches a state twice."""
+    if seen is None:
+        yield from entries
+        return
+    for entry in entries:
+        if entry[0] not in seen:
+            seen.add(entry[0])
+            yield entry
+
+
+def disagreement(grid, mask, solved, proved):
+    return RuntimeError(
+        f"Direct check ({solved}) and prover ({proved}) disagree on "
+        f"state {sorted(grid.names(grid.edges_of_mask(mask)))}"
+    )
+
+
+# Per-process state of a layer worker:
+# (grid, clue_masks, vertex_masks, free, permuters, limits, prove)
+_layer_worker = None
+
+
+def _init_layer_worker(height, width, clues, free, perms, limits, verify_with_prover):
+    global _layer_worker
+    grid = Grid(height, width)
+    prove = None
+    if verify_with_prover:
+        r, fol_prove = shadowprover()[:2]
+        goal = r(dnf_goal(grid, clues))
+        formulas = EdgeFormulas(grid)
+
+        def prove(mask):
+            return fol_prove(formulas.state(mask), goal)[0]
+
+    _layer_worker = (
+        grid,
+        *goal_masks(grid, clues),
+        free,
+        [mask_permuter(perm) for perm in perms],
+        limits,
+        prove,
+    )
+
+
+def _expand_chunk(chunk):
+    """Goal checks and successors for a slice of one BFS layer.
+
+    Returns (first goal state or None, successors, stats counts).
+    """
+    grid, clue_masks, vertex_masks, free, permuters, limits, prove = _layer_worker
+    counts = {"expanded": 0, "goal_checks": 0, "prover_calls": 0}
+    layer = []
+    for state, last in chunk:
+        counts["expanded"] += 1
+        plan_length = state.bit_count()
+        if plan_length >= 4:
+            counts["goal_checks"] += 1
+            solved = satisfies_goal(state, clue_masks, vertex_masks)
+            if prove is not None:
+                counts["prover_calls"] += 1
+                proved = prove(state)
+                if proved != solved:
+                    raise disagreement(grid, state, solved, proved)
+            if solved:
+                return state, layer, counts
+        if plan_length > grid.num_edges:
+            continue
+        layer.extend(successors(state, last, free, permuters, limits))
+    return None, layer, counts
+
+
+def solve_layers(
+    grid, clues, start, free, perms, limits, workers, verify_with_prover, stats
+):
+    """Level-synchronous BFS: each layer is split into chunks that worker
+    processes check and expand, and the next layer is merged (and, with
+    symmetries, deduplicated) in chunk order. The first goal state in layer
+    order is returned, so the result matches the sequential search.
+    """
+    processes = workers or os.cpu_count()
+    layer = [(start, -1)]
+    seen = {start} if perms else None
+    with ProcessPoolExecutor(
+        max_workers=processes,
+        initializer=_init_layer_worker,
+        initargs=(
+            grid.height,
+            grid.width,
+            clues,
+            free,
+            perms,
+            limits,
+            verify_with_prover,
+        ),
+    ) as executor:
+        while layer:
+            # A few chunks per worker, but not so small that pickling dominates
+            size = max(LAYER_CHUNK, -(-len(layer) // (4 * processes)))
+            chunks = [layer[i : i + size] for i in range(0, len(layer), size)]
+            layer = []
+            futures = [executor.submit(_expand_chunk, chunk) for chunk in chunks]
+            try:
+                for future in futures:
+                    solution, next_layer, counts = future.result()
+                    for key, count in counts.items():
+                        stats[key] += count
+                    if solution is not None:
+                        return grid.edges_of_mask(solution)
+                    layer.extend(unvisited(next_layer, seen))
+            finally:
+                # Chunks after a goal state (or a disagreement) are not
+                # needed; only those already running are waited for on exit
+                for future in futures:
+                    future.cancel()
+    return None
+
+
+def solve(
+    grid,
+    clues,
+    verify_with_prover=False,
+    break_symmetry=None,
+    presolve=True,
+    prover_workers=None,
+    prover_timeout=None,
+    workers=None,
+    prune=True,
+    best_first=False,
+    stats=None,
+):
+    """Shortest list of edge ids to draw, or None.
+
+    Goal checks count bits directly; verify_with_prover also confirms every
+    check with fol_prove against the full goal formula, in a ProverPool of
+    prover_workers warm processes when that is set (prover_timeout seconds
+    per query), so the search does not wait on each query. With presolve,
+    edges fixed by presolve.deduce are not searched: forced-on edges are
+    drawn from the start and forced-off edges are never drawn. With
+    break_symmetry, states that are rotations/reflections of each other under
+    a symmetry of the clues are expanded once, through their smallest
+    bitmask; that only pays off when goal checks are expensive, so by default
+    it is on exactly when verify_with_prover is. prune drops successors that
+    already break a clue or vertex (see edge_limits). best_first expands
+    states in A* order (see BestFirstQueue) instead of level by level.
+    workers switches to solve_layers with that many processes (0 for one
+    per CPU), each doing its own prover checks in-process; it cannot be
+    combined with best_first, prover_workers or prover_timeout. stats, if
+    given, is a dict that gets "expanded", "goal_checks" and "prover_calls"
+    counts.
+    """
+    if workers is not None:
+        unsupported = {
+            "best_first": best_first,
+            "prover_workers": prover_workers,
+            "prover_timeout": prover_timeout,
+        }
+        for name, value in unsupported.items():
+            if value not in (None, False):
+                raise ValueError(f"{name} cannot be combined with workers")
+    if stats is None:
+        stats = {}
+    for key in ("expanded", "goal_checks", "prover_calls"):
+        stats.setdefault(key, 0)
+
+    if break_symmetry is None:
+        break_symmetry = verify_with_prover
+    space = search_space(grid, clues, presolve, break_symmetry)
+    if space is None:
+        return None
+    start, free, perms = space
+    limits = edge_limits(grid, clues, free) if prune else None
+
+    if workers is not None:
+        return solve_layers(
+            grid, clues, start, free, perms, limits, workers, verify_with_prover, stats
+        )
+
+    clue_masks, vertex_masks = goal_masks(grid, clues)
+
+    pool = None
+    if verify_with_prover and prover_workers:
+        pool = ProverPool(grid, dnf_goal(grid, clues), prover_workers, prover_timeout)
+    elif verify_with_prover:
+        r, fol_prove = shadowprover()[:2]
+        goal = r(dnf_goal(grid, clues))
+        formulas = EdgeFormulas(grid)
+
+    # (state, direct result, prover future) for checks sent to the pool
+    pending = deque()
+
+    def confirm(mask, solved, proved):
+        if proved != solved:
+            raise disagreement(grid, mask, solved, proved)
+
+    def confirm_oldest():
+        mask, solved, future = pending.popleft()
+        confirm(mask, solved, pool.result(future))
+
+    def check_state(mask):
+        stats["goal_checks"] += 1
+        solved = satisfies_goal(mask, clue_masks, vertex_masks)
+        if pool is not None:
+            # The direct result drives the search; prover results are
+            # confirmed as they arrive, with a few queries per worker queued
+            stats["prover_calls"] += 1
+            pending.append((mask, solved, pool.submit(mask)))
+            while pending and (
+                pending[0][2].done() or len(pending) > 4 * prover_workers
+            ):
+                confirm_oldest()
+        elif verify_with_prover:
+            stats["prover_calls"] += 1
+            confirm(mask, solved, fol_prove(formulas.state(mask), goal)[0])
+        return solved
+
+    permuters = [mask_permuter(perm) for perm in perms]
+
+    # Entries are (state, position in free of the last edge drawn), see
+    # successors. Orbit leaders are deduplicated through seen; a state's plan
+    # length is its number of edges however it is reached, so that is safe
+    # for best_first too.
+    queue = BestFirstQueue(clue_masks) if best_first else deque()
+    queue.append((start, -1))
+    seen = {start} if permuters else None
+    solution = None
+
+    with pool or nullcontext():
+        while queue:
+            current_state, last = queue.popleft()
+            stats["expanded"] += 1
+
+            plan_length = current_state.bit_count()
+
+            # Don't bother checking the solution if there are not enough edges
+            if plan_length >= 4:
+                if check_state(current_state):
+                    solution = grid.edges_of_mask(current_state)
+                    break
+
+            # Stop if the total number of edges is exceeded
+            if plan_length > grid.num_edges:
+                continue
+
+            queue.extend(
+                unvisited(
+                    successors(current_state, last, free, permuters, limits), seen
+                )
+            )
+
+        # Every check the pool still has in flight must agree too
+        while pending:
+            confirm_oldest()
+
+    return solution
+
+
+def solve_dispatched(
+    grid,
+    clues,
+    concurrency=8,
+    timeout=None,
+    break_symmetry=True,
+    presolve=True,
+    prune=True,
+    stats=None,
+):
+    """Shortest list of edge ids to draw, or None, with fol_prove as the only
+    goal check, as in nxnbfs.py.
+
+    Each layer's candidate states go to a dispatch.Dispatcher, which keeps
+    up to concurrency long-lived prover processes busy for the whole search
+    and drops the rest of the layer once one state proves the goal. A query
+    running past timeout seconds raises TimeoutError. presolve,
+    break_symmetry and prune are as for solve. stats, if given, is a dict
+    that gets "expanded" and "prover_calls" counts.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("expanded", 0)
+
+    space = search_space(grid, clues, presolve, break_symmetry)
+    if space is None:
+        return None
+    start, free, perms = space
+    permuters = [mask_permuter(perm) for perm in perms]
+    limits = edge_limits(grid, clues, free) if prune else None
+    goal = dnf_goal(grid, clues)
+
+    async def search(dispatcher):
+        layer = [(start, -1)]
+        seen = {start} if permuters else None
+        while layer:
+            stats["expanded"] += len(layer)
+            found = await dispatcher.first_proved(
+                state for state, _ in layer if state.bit_count() >= 4
+            )
+            if found is not None:
+                return grid.edges_of_mask(found)
+
+            next_layer = []
+            for state, last in layer:
+                next_layer.extend(
+                    unvisited(successors(state, last, free, permuters, limits), seen)
+                )
+            layer = next_layer
+        return None
+
+    async def run():
+        async with Dispatcher(grid, goal, concurrency, timeout, stats) as dispatcher:
+            return await search(dispatcher)
+
+    return asyncio.run(run())
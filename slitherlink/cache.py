@@ -0,0 +1,150 @@
+"""Persistent solution cache in a local SQLite file.
+
+Entries are keyed by a hash of the puzzle (height, width, sorted clues) in
+its canonical orientation and hold the on-edge names (or "no solution"), the
+engine that solved it and how long that took. When the stored solutions
+exceed max_bytes, the least recently used entries are evicted.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from .grid import Grid
+from .symmetry import IDENTITY, canonicalize, edges_to_original
+
+DEFAULT_DIR = ".slitherlink_cache"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS solutions (
+    key TEXT PRIMARY KEY,
+    height INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    edges TEXT,
+    engine TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    size INTEGER NOT NULL,
+    last_used REAL NOT NULL
+)
+"""
+
+
+def puzzle_key(height, width, clues):
+    canonical = json.dumps(
+        [height, width, sorted([r, c, k] for (r, c), k in clues.items())],
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class SolutionCache:
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "solutions.sqlite")
+        self.max_bytes = max_bytes
+        # Several worker processes may share the file
+        self.db = sqlite3.connect(self.path, timeout=60)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(SCHEMA)
+        self.db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def get(self, height, width, clues):
+        """{"edges": names or None, "engine": ..., "seconds": ...}; None on a miss."""
+        key = puzzle_key(height, width, clues)
+        # Each write commits or rolls back on the spot, so a timeout signal
+        # raised mid-call cannot leave this process holding the write lock
+        with self.db:
+            row = self.db.execute(
+                "SELECT edges, engine, seconds FROM solutions WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+        edges, engine, seconds = row
+        return {
+            "edges": None if edges is None else json.loads(edges),
+            "engine": engine,
+            "seconds": seconds,
+        }
+
+    def put(self, height, width, clues, edges, engine, seconds):
+        """Store a puzzle's on-edge names; edges=None records "no solution"."""
+        key = puzzle_key(height, width, clues)
+        data = None if edges is None else json.dumps(sorted(edges))
+        size = len(key) + (len(data) if data else 0)
+        with self.db:
+            self.db.execute(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, height, width, data, engine, seconds, size, time.time()),
+            )
+            self.evict()
+
+    def evict(self):
+        total = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM solutions"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.db.execute("SELECT key, size FROM solutions ORDER BY last_used")
+        stale = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            stale.append((key,))
+            total -= size
+        self.db.executemany("DELETE FROM solutions WHERE key = ?", stale)
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+
+def cached_solve(cache, grid, clues, engine, solve):
+    """Look the puzzle up, else run solve and store the result.
+
+    Puzzles are stored in their canonical orientation (see symmetry), so a
+    rotation or reflection of an already solved board is a hit. On a miss the
+    canonical board is solved and the solution is mapped back onto grid.
+
+    Returns (on-edge ids or None, cache entry dict, hit).
+    """
+    height, width, canon_clues, transform = canonicalize(
+        grid.height, grid.width, clues
+    )
+    canon_grid = grid if transform == IDENTITY else Grid(height, width)
+
+    entry = cache.get(height, width, canon_clues)
+    hit = entry is not None
+    if hit:
+        edges = entry["edges"]
+        if edges is None:
+            canon_edges = None
+        else:
+            canon_edges = {canon_grid.edge_index[e] for e in edges}
+    else:
+        start_time = time.perf_counter()
+        canon_edges = solve(canon_grid, canon_clues)
+        seconds = time.perf_counter() - start_time
+
+        names = sorted(canon_grid.names(canon_edges)) if canon_edges else None
+        cache.put(height, width, canon_clues, names, engine, seconds)
+        entry = {"edges": names, "engine": engine, "seconds": seconds}
+
+    if not canon_edges:
+        return None, entry, hit
+    if transform == IDENTITY:
+        return set(canon_edges), entry, hit
+    return edges_to_original(grid, transform, canon_edges, canon_grid), entry, hit
@@ -0,0 +1,282 @@
+"""Solve many puzzles from a file in parallel, streaming JSONL results.
+
+    python -m slitherlink puzzles.jsonl --engine sat --workers 16 --timeout 60
+
+Input is JSONL, one puzzle per line:
+
+    {"id": "p1", "height": 2, "width": 2, "clues": [[0, 0, 3], [1, 0, 2], [1, 1, 3]]}
+
+or a text file of grids in the puzzle-loop.com layout, one row per line with
+digits for clues and "." for empty cells, puzzles separated by blank lines and
+optionally named by a preceding "# name" line:
+
+    # p1
+    3.
+    23
+"""
+
+import argparse
+import json
+import os
+import itertools
+import signal
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import lru_cache
+
+from . import backtrack
+from .cache import DEFAULT_DIR, SolutionCache, cached_solve
+from .engines import ENGINES
+from .grid import Grid, parse_puzzle, parse_size
+
+EMPTY_CELLS = {".", "-", "_"}
+
+# --check status by number of solutions found (capped at 2)
+CHECK_STATUS = ["unsolvable", "unique", "multiple"]
+
+# Puzzles queued per worker process in solve_all
+IN_FLIGHT_PER_WORKER = 4
+
+
+class PuzzleTimeout(Exception):
+    pass
+
+
+def parse_text_grid(rows):
+    clues = {}
+    width = 0
+    for r, row in enumerate(rows):
+        tokens = row.split() if any(ch.isspace() for ch in row.strip()) else list(row)
+        width = max(width, len(tokens))
+        for c, tok in enumerate(tokens):
+            if tok in EMPTY_CELLS:
+                continue
+            if tok not in {"0", "1", "2", "3", "4"}:
+                raise ValueError(f"Bad clue {tok!r} in row {r}: {row!r}")
+            clues[(r, c)] = int(tok)
+    return len(rows), width, clues
+
+
+def bad_puzzle(puzzle_id, error):
+    """Placeholder for an input record that could not be read, so the rest of
+    the file is still solved and this one reports status "error"."""
+    return {"id": puzzle_id, "error": f"{type(error).__name__}: {error}"}
+
+
+def read_jsonl(lines):
+    for n, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        puzzle_id = n
+        try:
+            data = json.loads(line)
+            puzzle_id = data.get("id", n)
+            if "grid" in data:
+                height, width, clues = parse_text_grid(data["grid"])
+                parse_size(height, width)
+            else:
+                height, width, clues = parse_puzzle(data)
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            yield bad_puzzle(puzzle_id, e)
+            continue
+        yield {
+            "id": puzzle_id,
+            "height": height,
+            "width": width,
+            "clues": clues,
+        }
+
+
+def read_text(lines):
+    name, rows, count = None, [], 0
+
+    def flush():
+        puzzle_id = name if name is not None else count
+        try:
+            height, width, clues = parse_text_grid(rows)
+        except ValueError as e:
+            return bad_puzzle(puzzle_id, e)
+        return {
+            "id": puzzle_id,
+            "height": height,
+            "width": width,
+            "clues": clues,
+        }
+
+    for line in lines:
+        line = line.rstrip("\n")
+        if line.startswith("#"):
+            name = line[1:].strip()
+        elif line.strip():
+            rows.append(line.strip())
+        elif rows:
+            yield flush()
+            name, rows, count = None, [], count + 1
+    if rows:
+        yield flush()
+
+
+def read_puzzles(path, fmt="auto"):
+    if fmt == "auto":
+        fmt = "jsonl" if path.endswith((".jsonl", ".json")) else "text"
+    with open(path) as f:
+        reader = read_jsonl if fmt == "jsonl" else read_text
+        yield from reader(f)
+
+
+@lru_cache(maxsize=None)
+def grid_for(height, width):
+    # One Grid per board size for the lifetime of a worker process
+    return Grid(height, width)
+
+
+@lru_cache(maxsize=None)
+def cache_for(directory):
+    return SolutionCache(directory)
+
+
+def _on_timeout(signum, frame):
+    raise PuzzleTimeout()
+
+
+def solve_puzzle(puzzle, engine, timeout=None, cache_dir=None, check=None):
+    """Solve one puzzle dict in the current process and return its result record.
+
+    With check set to "count" or "unique", the backtracking engine counts the
+    solutions instead (stopping at 2 for "unique") and the status is
+    "unique", "multiple" or "unsolvable".
+
+    The timeout is a SIGALRM, which Python only handles between bytecodes:
+    an engine inside one long C call (pycosat for the sat engine) overruns
+    it until that call returns.
+    """
+    if check:
+        engine = "backtrack"
+    result = {"id": puzzle["id"], "engine": engine}
+    if "error" in puzzle:
+        result.update(status="error", error=puzzle["error"], time=0.0)
+        return result
+    clues = puzzle["clues"]
+
+    use_alarm = timeout and hasattr(signal, "SIGALRM")
+    if use_alarm:
+        signal.signal(signal.SIGALRM, _on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+
+    start_time = time.perf_counter()
+    try:
+        grid = grid_for(*parse_size(puzzle["height"], puzzle["width"]))
+        grid.check_clues(clues)
+        on_edges = None
+        if check:
+            limit = 2 if check == "unique" else None
+            result["solutions"] = backtrack.count_solutions(grid, clues, limit)
+        elif cache_dir:
+            on_edges, entry, hit = cached_solve(
+                cache_for(cache_dir), grid, clues, engine, ENGINES[engine]
+            )
+            result["cached"] = hit
+            result["solved_by"] = entry["engine"]
+        else:
+            on_edges = ENGINES[engine](grid, clues)
+    except PuzzleTimeout:
+        result["status"] = "timeout"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    else:
+        if check:
+            result["status"] = CHECK_STATUS[min(result["solutions"], 2)]
+        elif on_edges:
+            result["status"] = "solved"
+            result["edges"] = sorted(grid.names(on_edges))
+        else:
+            result["status"] = "unsolvable"
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    result["time"] = round(time.perf_counter() - start_time, 6)
+    return result
+
+
+def solve_all(
+    puzzles, engine, workers=None, timeout=None, cache_dir=None, check=None
+):
+    """Yield result records as puzzles finish, solving across a process pool.
+
+    Puzzles are read lazily and at most IN_FLIGHT_PER_WORKER per worker are
+    queued at a time, so results stream out while the file is still being
+    read.
+    """
+    if workers == 1:
+        for puzzle in puzzles:
+            yield solve_puzzle(puzzle, engine, timeout, cache_dir, check)
+        return
+
+    window = IN_FLIGHT_PER_WORKER * (workers or os.cpu_count() or 1)
+    puzzles = iter(puzzles)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        while True:
+            for puzzle in itertools.islice(puzzles, window - len(running)):
+                running.add(
+                    pool.submit(solve_puzzle, puzzle, engine, timeout, cache_dir, check)
+                )
+            if not running:
+                break
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m slitherlink",
+        description="Solve a file of Slitherlink puzzles in parallel.",
+    )
+    parser.add_argument("puzzles", help="JSONL or text file of puzzles")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="sat")
+    parser.add_argument(
+        "--format", choices=["auto", "jsonl", "text"], default="auto", dest="fmt"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count(), help="worker processes"
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        help="seconds per puzzle (not enforced inside pycosat, see solve_puzzle)",
+    )
+    parser.add_argument("--output", "-o", help="results file (default stdout)")
+    parser.add_argument(
+        "--cache",
+        nargs="?",
+        const=DEFAULT_DIR,
+        metavar="DIR",
+        help=f"reuse and store solutions in a persistent cache (default {DEFAULT_DIR})",
+    )
+    parser.add_argument(
+        "--check",
+        choices=["count", "unique"],
+        help="count solutions (or stop at 2 for unique) instead of solving",
+    )
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    puzzles = read_puzzles(args.puzzles, args.fmt)
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        results = solve_all(
+            puzzles, args.engine, args.workers, args.timeout, args.cache, args.check
+        )
+        for result in results:
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
@@ -0,0 +1,171 @@
+"""Concurrent prover goal checks with asyncio over long-lived worker processes.
+
+Each worker is
+
+    python -m slitherlink.dispatch
+
+which reads {"height", "width", "goal"} as one JSON line on stdin, imports
+ShadowProver and parses the goal and edge formulas once, then answers one
+state bitmask per line with 1 or 0. Dispatcher.first_proved keeps up to
+`concurrency` of them busy, drawing candidates lazily, returns the first
+state that proves the goal and drops the rest, so the event loop overlaps
+prover latency instead of idling on each call.
+"""
+
+import asyncio
+import json
+import os
+import signal
+import sys
+
+from .grid import Grid
+from .prover import EdgeFormulas, shadowprover
+
+# Directory holding the slitherlink package, for the workers' import path
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Worker:
+    """One prover process, answering a single query at a time."""
+
+    __slots__ = ("proc",)
+
+    def __init__(self, proc):
+        self.proc = proc
+
+    @classmethod
+    async def start(cls, grid, goal):
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            [PACKAGE_ROOT] + [p for p in [env.get("PYTHONPATH")] if p]
+        )
+        proc = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-m",
+            "slitherlink.dispatch",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=env,
+            # A session of its own, so kill also reaches the E run
+            start_new_session=True,
+        )
+        header = {"height": grid.height, "width": grid.width, "goal": goal}
+        proc.stdin.write(json.dumps(header).encode() + b"\n")
+        return cls(proc)
+
+    async def prove(self, mask):
+        self.proc.stdin.write(b"%d\n" % mask)
+        await self.proc.stdin.drain()
+        answer = await self.proc.stdout.readline()
+        if not answer:
+            await self.proc.wait()
+            raise RuntimeError(
+                f"Prover subprocess exited with {self.proc.returncode}"
+            )
+        return answer.strip() == b"1"
+
+    async def kill(self):
+        if self.proc.returncode is None:
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            except (AttributeError, ProcessLookupError, PermissionError):
+                self.proc.kill()
+        await self.proc.wait()
+
+
+class Dispatcher:
+    """Up to concurrency prover workers checking states against one goal.
+
+    goal is the formula string. A query still running after timeout seconds
+    raises TimeoutError, as in ProverPool, since treating it as not proved
+    could pass over the shortest solution or report none at all; its worker
+    is killed. stats, if given, is a dict that gets a "prover_calls" count.
+    Use as an async context manager so the workers are stopped at the end.
+    """
+
+    def __init__(self, grid, goal, concurrency=8, timeout=None, stats=None):
+        self.grid = grid
+        self.goal = goal
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.stats = {} if stats is None else stats
+        self.stats.setdefault("prover_calls", 0)
+        self.idle = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        idle, self.idle = self.idle, []
+        for worker in idle:
+            await worker.kill()
+
+    async def check(self, mask):
+        """mask if its state proves the goal, else None."""
+        if self.idle:
+            worker = self.idle.pop()
+        else:
+            worker = await Worker.start(self.grid, self.goal)
+        self.stats["prover_calls"] += 1
+        try:
+            proved = await asyncio.wait_for(worker.prove(mask), self.timeout)
+        except BaseException:
+            # Timed out, cancelled or failed mid-query; its answer would be
+            # read as the next query's, so the worker goes too
+            await worker.kill()
+            raise
+        self.idle.append(worker)
+        return mask if proved else None
+
+    async def first_proved(self, masks):
+        """First of masks, in completion order, whose state proves the goal,
+        or None. masks is read lazily, concurrency at a time."""
+        masks = iter(masks)
+        running = set()
+        try:
+            while True:
+                for mask in masks:
+                    running.add(asyncio.create_task(self.check(mask)))
+                    if len(running) >= self.concurrency:
+                        break
+                if not running:
+                    return None
+                done, running = await asyncio.wait(
+                    running, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.result() is not None:
+                        return task.result()
+        finally:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+
+
+async def first_proved(grid, goal, masks, concurrency=8, timeout=None, stats=None):
+    """Dispatcher.first_proved with workers started and stopped for this call."""
+    async with Dispatcher(grid, goal, concurrency, timeout, stats) as dispatcher:
+        return await dispatcher.first_proved(masks)
+
+
+def main():
+    # Answers go to the original stdout; anything the prover or E prints
+    # goes to stderr instead so it cannot be mistaken for one
+    answers = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    header = json.loads(sys.stdin.readline())
+    r, fol_prove = shadowprover()[:2]
+    formulas = EdgeFormulas(Grid(header["height"], header["width"]))
+    goal = r(header["goal"])
+    for line in sys.stdin:
+        proved = fol_prove(formulas.state(int(line)), goal)[0]
+        answers.write("1\n" if proved else "0\n")
+        answers.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Engine registry: name -> solve(grid, clues, stats=None).
+
+Each returns the drawn edge ids (a set, or a plan list for the planners) or
+None. The bfs and spectra engines also pass keyword options (presolve=False,
+say) through to their module's solve. Engine modules are imported on first
+use so ShadowProver is only loaded for the engines that need it.
+"""
+
+
+def _bfs(grid, clues, stats=None, **options):
+    from . import bfs
+
+    return bfs.solve(grid, clues, stats=stats, **options)
+
+
+def _bfs_prover(grid, clues, stats=None, **options):
+    from . import bfs
+
+    return bfs.solve(grid, clues, verify_with_prover=True, stats=stats, **options)
+
+
+def _spectra(grid, clues, stats=None, **options):
+    from . import spectra
+
+    return spectra.solve(grid, clues, stats=stats, **options)
+
+
+def _spectra_cnf(grid, clues, stats=None, **options):
+    from . import spectra
+
+    return spectra.solve(grid, clues, encoding="cnf", stats=stats, **options)
+
+
+def _backtrack(grid, clues, stats=None):
+    from . import backtrack
+
+    return backtrack.solve(grid, clues, stats=stats)
+
+
+def _sat(grid, clues, stats=None):
+    from . import sat
+
+    return sat.solve(grid, clues, stats=stats)
+
+
+def _transfer(grid, clues, stats=None):
+    from . import transfer
+
+    return transfer.solve(grid, clues, stats=stats)
+
+
+ENGINES = {
+    "bfs": _bfs,
+    "bfs-prover": _bfs_prover,
+    "spectra": _spectra,
+    "spectra-cnf": _spectra_cnf,
+    "backtrack": _backtrack,
+    "sat": _sat,
+    "transfer": _transfer,
+}
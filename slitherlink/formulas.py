@@ -0,0 +1,132 @@
+"""ShadowProver goal formulas (as s-expression strings) for a Grid and its clues."""
+
+import itertools
+
+
+def make_op(op, items):
+    # Flat n-ary (op a b c ...) in a single join
+    if not items:
+        return ""
+    if len(items) == 1:
+        return items[0]
+    return f"({op} " + " ".join(items) + ")"
+
+
+def on(name):
+    return f"(On {name})"
+
+
+def off(name):
+    return f"(not (On {name}))"
+
+
+def exactly_k_of_4(edges4, k):
+    """CNF-ish encoding for exactly k edges On among these 4."""
+    x = [on(e) for e in edges4]
+    nx = [off(e) for e in edges4]
+
+    if k == 0:
+        return "(and " + " ".join(nx) + ")"
+    if k == 4:
+        return "(and " + " ".join(x) + ")"
+
+    if k == 3:
+        clauses = []
+        clauses.append("(or " + " ".join(nx) + ")")  # at least one false
+        for i in range(4):
+            for j in range(i + 1, 4):
+                clauses.append(f"(or {x[i]} {x[j]})")  # at most one false
+        return "(and " + " ".join(clauses) + ")"
+
+    if k == 1:
+        clauses = []
+        clauses.append("(or " + " ".join(x) + ")")  # at least one true
+        for i in range(4):
+            for j in range(i + 1, 4):
+                clauses.append(f"(or {nx[i]} {nx[j]})")  # at most one true
+        return "(and " + " ".join(clauses) + ")"
+
+    if k == 2:
+        clauses = []
+        triples = [(0, 1, 2), (0, 1, 3), (0, 2, 3), (1, 2, 3)]
+        for i, j, l in triples:
+            clauses.append(f"(or {nx[i]} {nx[j]} {nx[l]})")  # not all 3 true
+        for i, j, l in triples:
+            clauses.append(f"(or {x[i]} {x[j]} {x[l]})")  # not all 3 false
+        return "(and " + " ".join(clauses) + ")"
+
+    raise ValueError("k must be 0..4")
+
+
+def degree_0_or_2(edges_at_vertex):
+    # allow degree 0 or 2 at each vertex
+    if len(edges_at_vertex) == 0:
+        return "(and)"
+    if len(edges_at_vertex) == 1:
+        return off(edges_at_vertex[0])
+
+    all_off = "(and " + " ".join(off(e) for e in edges_at_vertex) + ")"
+
+    pairs = []
+    m = len(edges_at_vertex)
+    for i in range(m):
+        for j in range(i + 1, m):
+            parts = []
+            for k in range(m):
+                e = edges_at_vertex[k]
+                parts.append(on(e) if (k == i or k == j) else off(e))
+            pairs.append("(and " + " ".join(parts) + ")")
+
+    exactly_2 = pairs[0] if len(pairs) == 1 else "(or " + " ".join(pairs) + ")"
+    return "(or " + all_off + " " + exactly_2 + ")"
+
+
+def dnf_goal(grid, clues):
+    """Goal used by nxnbfs.py/nxnfinal.py: each clue and vertex as an or of
+    every allowed on/off pattern of its edges."""
+    names = grid.edge_names
+    goal_clauses = []
+
+    # Logic for each clue
+    for (r_i, c_i), count in clues.items():
+        cell_edges = [names[e] for e in grid.edges_of_cell(grid.cell(r_i, c_i))]
+        valid_configs = []
+        for on_indices in itertools.combinations(range(4), count):
+            parts = [
+                on(e) if i in on_indices else off(e) for i, e in enumerate(cell_edges)
+            ]
+            valid_configs.append(make_op("and", parts))
+        if valid_configs:
+            goal_clauses.append(make_op("or", valid_configs))
+
+    # Either a degree of 0 or 2 for each vertex so there are no loose ends
+    for p in range(grid.num_vertices):
+        incident = [names[e] for e in grid.edges_at_vertex(p)]
+        valid_vertex = [make_op("and", [off(e) for e in incident])]
+        for on_indices in itertools.combinations(range(len(incident)), 2):
+            parts = [
+                on(e) if i in on_indices else off(e) for i, e in enumerate(incident)
+            ]
+            valid_vertex.append(make_op("and", parts))
+        goal_clauses.append(make_op("or", valid_vertex))
+
+    return make_op("and", goal_clauses)
+
+
+def cnf_goal(grid, clues):
+    """Goal used by 1x1.py/1x2.py: clause-style clues, vertex degrees and a
+    non-empty drawing."""
+    names = grid.edge_names
+    clue_goals = [
+        exactly_k_of_4([names[e] for e in grid.edges_of_cell(grid.cell(r, c))], k)
+        for (r, c), k in clues.items()
+    ]
+    vertex_goals = [
+        degree_0_or_2([names[e] for e in grid.edges_at_vertex(p)])
+        for p in range(grid.num_vertices)
+    ]
+
+    # Force a non-empty loop
+    nonempty_goal = "(or " + " ".join(on(e) for e in names) + ")"
+
+    return make_op("and", clue_goals + vertex_goals + [nonempty_goal])
@@ -0,0 +1,183 @@
+from array import array
+
+CLUE_WORDS = {"zero": 0, "one": 1, "two": 2, "three": 3, "four": 4}
+
+
+def parse_clues(clue_triples):
+    """(row, col, clue) triples, clue as a digit or word, to {(row, col): count}."""
+    clues = {}
+    for rr, cc, val in clue_triples:
+        tok = str(val).strip().lower()
+        if tok in CLUE_WORDS:
+            clues[(rr, cc)] = CLUE_WORDS[tok]
+        elif tok in {"0", "1", "2", "3", "4"}:
+            clues[(rr, cc)] = int(tok)
+        else:
+            raise ValueError(f"Bad clue token: {val}")
+    return clues
+
+
+def parse_size(height, width):
+    """(height, width) as positive ints, from ints or digit strings."""
+    size = []
+    for value in (height, width):
+        if isinstance(value, str) and value.strip().isdigit():
+            value = int(value)
+        if type(value) is not int or value < 1:
+            raise ValueError(f"Bad board size: {height!r} x {width!r}")
+        size.append(value)
+    return tuple(size)
+
+
+def parse_puzzle(data):
+    """(height, width, clues) from a {"height", "width", "clues"} dict such as
+    one JSONL input line, with the size and clue cells checked."""
+    height, width = parse_size(data["height"], data["width"])
+    clues = parse_clues(data.get("clues", []))
+    for r, c in clues:
+        on_board = type(r) is int and type(c) is int
+        if not (on_board and 0 <= r < height and 0 <= c < width):
+            raise ValueError(
+                f"Clue cell {(r, c)} is outside the {height}x{width} board"
+            )
+    return height, width, clues
+
+
+class Grid:
+    """Edge, cell and vertex geometry of a height x width board, built once.
+
+    Edges are numbered like all_edges in the original scripts: every
+    horizontal edge row by row, then every vertical edge row by row.
+    Engines work on these integer ids; edge_names/edge_index map them to and
+    from the delimited names (h_<row>_<col>, v_<row>_<col>) used in prover
+    formulas and plans, which stay unambiguous past 9 rows or columns.
+    Cells and vertices are numbered row-major. Incidence is kept in flat
+    arrays: a cell's 4 edges (top, bottom, left, right) start at 4 * cell,
+    and a vertex's edges are vertex_edges[vertex_offsets[p]:vertex_offsets[p + 1]].
+    """
+
+    __slots__ = (
+        "height",
+        "width",
+        "num_edges",
+        "num_cells",
+        "num_vertices",
+        "edge_names",
+        "edge_index",
+        "cell_edges",
+        "vertex_offsets",
+        "vertex_edges",
+        "edge_vertices",
+    )
+
+    def __init__(self, height, width):
+        self.height = height
+        self.width = width
+        self.num_cells = height * width
+        self.num_vertices = (height + 1) * (width + 1)
+        self.num_edges = (height + 1) * width + height * (width + 1)
+
+        names = []
+        edge_vertices = array("i")
+        for r in range(height + 1):
+            for c in range(width):
+                names.append(f"h_{r}_{c}")
+                edge_vertices.extend((self.vertex(r, c), self.vertex(r, c + 1)))
+        for r in range(height):
+            for c in range(width + 1):
+                names.append(f"v_{r}_{c}")
+                edge_vertices.extend((self.vertex(r, c), self.vertex(r + 1, c)))
+        self.edge_names = names
+        self.edge_index = {name: i for i, name in enumerate(names)}
+        self.edge_vertices = edge_vertices
+
+        cell_edges = array("i")
+        for r in range(height):
+            for c in range(width):
+                cell_edges.extend(
+                    (self.h(r, c), self.h(r + 1, c), self.v(r, c), self.v(r, c + 1))
+                )
+        self.cell_edges = cell_edges
+
+        vertex_offsets = array("i", [0])
+        vertex_edges = array("i")
+        for r in range(height + 1):
+            for c in range(width + 1):
+                if c > 0:
+                    vertex_edges.append(self.h(r, c - 1))
+                if c < width:
+                    vertex_edges.append(self.h(r, c))
+                if r > 0:
+                    vertex_edges.append(self.v(r - 1, c))
+                if r < height:
+                    vertex_edges.append(self.v(r, c))
+                vertex_offsets.append(len(vertex_edges))
+        self.vertex_offsets = vertex_offsets
+        self.vertex_edges = vertex_edges
+
+    def __repr__(self):
+        return f"Grid({self.height}, {self.width})"
+
+    def h(self, r, c):
+        return r * self.width + c
+
+    def v(self, r, c):
+        return (self.height + 1) * self.width + r * (self.width + 1) + c
+
+    def cell(self, r, c):
+        return r * self.width + c
+
+    def vertex(self, r, c):
+        return r * (self.width + 1) + c
+
+    def edges_of_cell(self, cell):
+        return self.cell_edges[4 * cell : 4 * cell + 4]
+
+    def edges_at_vertex(self, vertex):
+        return self.vertex_edges[
+            self.vertex_offsets[vertex] : self.vertex_offsets[vertex + 1]
+        ]
+
+    def edge_mask(self, edge_ids):
+        mask = 0
+        for e in edge_ids:
+            mask |= 1 << e
+        return mask
+
+    def edges_of_mask(self, mask):
+        return [e for e in range(self.num_edges) if mask >> e & 1]
+
+    def names(self, edge_ids):
+        return {self.edge_names[e] for e in edge_ids}
+
+    def check_clues(self, clues):
+        for (r, c), count in clues.items():
+            if not (0 <= r < self.height and 0 <= c < self.width):
+                raise ValueError(f"Clue cell {(r, c)} is outside the {self!r}")
+            if not 0 <= count <= 4:
+                raise ValueError(f"Clue {count} at {(r, c)} must be 0..4")
+
+    def render(self, on_edges, clues):
+        """ASCII drawing of a set of on-edge ids, with clues in their cells."""
+        on_edges = set(on_edges)
+        lines = []
+        for r in range(self.height + 1):
+            line_str = ""
+            for c in range(self.width + 1):
+                line_str += "●"
+                if c < self.width:
+                    line_str += "───" if self.h(r, c) in on_edges else "   "
+            lines.append(line_str)
+
+            if r < self.height:
+                row_str = ""
+                for c in range(self.width + 1):
+                    row_str += "│" if self.v(r, c) in on_edges else " "
+                    if c < self.width:
+                        val = clues.get((r, c), " ")
+                        row_str += f" {val} "
+                lines.append(row_str)
+        return "\n".join(lines)
+
+    def print_ascii(self, on_edges, clues):
+        print(self.render(on_edges, clues))
@@ -0,0 +1,119 @@
+"""Deduction rules applied before search, fixing edges every solution shares.
+
+Only rules that hold when several loops are allowed are used: counting on
+clue cells and vertices (0-clues, full cells, a vertex with two lines or
+only one way left to continue), 3s and 1s in corners (and any cell corner
+where just two edges can still meet), and adjacent 3s.
+"""
+
+from .backtrack import OFF, ON, UNKNOWN, build_constraints, build_watches, propagate
+
+
+def adjacent_threes(grid, clues):
+    """(edge, value) pairs forced by pairs of neighbouring 3s.
+
+    Both outer edges parallel to the shared one are On, and the edges that
+    continue the shared edge past the two cells are Off.
+    """
+    forced = []
+    for (r_i, c_i), count in clues.items():
+        if count != 3:
+            continue
+        if clues.get((r_i, c_i + 1)) == 3:
+            forced.append((grid.v(r_i, c_i), ON))
+            forced.append((grid.v(r_i, c_i + 2), ON))
+            if r_i > 0:
+                forced.append((grid.v(r_i - 1, c_i + 1), OFF))
+            if r_i + 1 < grid.height:
+                forced.append((grid.v(r_i + 1, c_i + 1), OFF))
+        if clues.get((r_i + 1, c_i)) == 3:
+            forced.append((grid.h(r_i, c_i), ON))
+            forced.append((grid.h(r_i + 2, c_i), ON))
+            if c_i > 0:
+                forced.append((grid.h(r_i + 1, c_i - 1), OFF))
+            if c_i + 1 < grid.width:
+                forced.append((grid.h(r_i + 1, c_i + 1), OFF))
+    return forced
+
+
+def corner_pairs(grid, clues, values):
+    """(edge, value) pairs forced at vertices where only two perpendicular
+    edges are left, or None on a contradiction.
+
+    Those two edges are either both On or both Off, so a clue cell holding
+    both of them (a 3 or 1 in a board corner, say) often decides which.
+    """
+    num_h = (grid.height + 1) * grid.width
+    forced = []
+    for p in range(grid.num_vertices):
+        edges = grid.edges_at_vertex(p)
+        if any(values[e] == ON for e in edges):
+            continue
+        pair = [e for e in edges if values[e] == UNKNOWN]
+        if len(pair) != 2 or (pair[0] < num_h) == (pair[1] < num_h):
+            continue
+
+        h_e, v_e = pair
+        cell = ((v_e - num_h) // (grid.width + 1), h_e % grid.width)
+        if cell not in clues:
+            continue
+        others = [e for e in grid.edges_of_cell(grid.cell(*cell)) if e not in pair]
+        on = sum(values[e] == ON for e in others)
+        unknown = sum(values[e] == UNKNOWN for e in others)
+
+        feasible = [
+            value
+            for value in (OFF, ON)
+            if on <= clues[cell] - 2 * value <= on + unknown
+        ]
+        if not feasible:
+            return None
+        if len(feasible) == 1:
+            forced.extend((e, feasible[0]) for e in pair)
+    return forced
+
+
+def deduce(grid, clues):
+    """Edge values (ON, OFF or UNKNOWN per edge id) after applying the rules
+    to a fixpoint, or None if they show the clues have no solution."""
+    constraints = build_constraints(grid, clues)
+    watches = build_watches(grid, constraints)
+    values = [UNKNOWN] * grid.num_edges
+    trail = []
+    pending = set(range(len(constraints)))
+
+    forced = adjacent_threes(grid, clues)
+    while True:
+        for e, value in forced:
+            if values[e] == UNKNOWN:
+                values[e] = value
+                pending.update(watches[e])
+            elif values[e] != value:
+                return None
+        if not propagate(values, trail, pending, constraints, watches):
+            return None
+
+        forced = corner_pairs(grid, clues, values)
+        if forced is None:
+            return None
+        if not forced:
+            return values
+
+
+def plan_length_bound(grid, clues, values):
+    """Most edges a solution can add to the ones already On in values.
+
+    Undecided edges of an unclued cell are not limited; every other undecided
+    edge uses up one unit of a neighbouring clue's remaining count.
+    """
+    free = {e for e, value in enumerate(values) if value == UNKNOWN}
+    unlimited = set()
+    deficit = 0
+    for cell in range(grid.num_cells):
+        edges = grid.edges_of_cell(cell)
+        count = clues.get(divmod(cell, grid.width))
+        if count is None:
+            unlimited.update(e for e in edges if e in free)
+        else:
+            deficit += count - sum(values[e] == ON for e in edges)
+    return len(unlimited) + min(deficit, len(free - unlimited))
@@ -0,0 +1,119 @@
+"""Lazy access to ShadowProver, which only the prover-backed engines need."""
+
+import multiprocessing
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+
+from .formulas import off, on
+from .grid import Grid
+
+
+def shadowprover():
+    """Import ShadowProver on first use, defaulting EPROVER_HOME like the scripts."""
+    os.environ.setdefault("EPROVER_HOME", "./eprover/")
+    import shadowprover.reasoners.planner as planner
+    from shadowprover.experimental.sst_prover import SST_Prover
+    from shadowprover.fol.fol_prover import fol_prove
+    from shadowprover.syntax.reader import r
+
+    return r, fol_prove, planner, SST_Prover
+
+
+class EdgeFormulas:
+    """Parsed (On e) / (not (On e)) per edge id, so bitmask states are only
+    turned into formulas when the prover actually needs them."""
+
+    __slots__ = ("on", "off")
+
+    def __init__(self, grid):
+        r = shadowprover()[0]
+        self.on = [r(on(e)) for e in grid.edge_names]
+        self.off = [r(off(e)) for e in grid.edge_names]
+
+    def state(self, mask):
+        return frozenset(
+            self.on[i] if mask >> i & 1 else self.off[i] for i in range(len(self.on))
+        )
+
+
+# Per-process state of a ProverPool worker: (fol_prove, formulas, goal)
+_worker = None
+
+
+def _init_worker(height, width, goal, pids):
+    global _worker
+    if hasattr(os, "setpgrp"):
+        # A group of our own, so ProverPool.kill also reaches the E run
+        os.setpgrp()
+    pids.put(os.getpid())
+    r, fol_prove = shadowprover()[:2]
+    _worker = (fol_prove, EdgeFormulas(Grid(height, width)), r(goal))
+
+
+def _prove(mask):
+    fol_prove, formulas, goal = _worker
+    return fol_prove(formulas.state(mask), goal)[0]
+
+
+class ProverPool:
+    """Warm worker processes that check bitmask states against one goal.
+
+    Each worker imports ShadowProver and parses the edge formulas and the
+    goal once, so a query only sends the state's bitmask. fol_prove still
+    runs E for every query; the pool saves the per-query import, parsing
+    and serialization around it and lets several queries run at once.
+    timeout is in seconds per query; when it expires, result raises
+    TimeoutError after killing the workers and their E runs, and the pool
+    cannot be used again.
+    """
+
+    def __init__(self, grid, goal, workers=None, timeout=None):
+        self.timeout = timeout
+        # Each worker reports its pid (and process group) here when it starts
+        context = multiprocessing.get_context()
+        self.pids = context.SimpleQueue()
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(grid.height, grid.width, goal, self.pids),
+        )
+
+    def submit(self, mask):
+        """Future for whether the state proves the goal."""
+        return self.executor.submit(_prove, mask)
+
+    def result(self, future):
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            self.kill()
+            raise
+
+    def prove(self, mask):
+        return self.result(self.submit(mask))
+
+    def kill(self):
+        """Stop every worker now, without waiting for running queries."""
+        # ProcessPoolExecutor has no public way to stop a running task, so
+        # kill every worker that has started (a query only runs in those)
+        while not self.pids.empty():
+            pid = self.pids.get()
+            try:
+                if hasattr(os, "killpg"):
+                    os.killpg(pid, signal.SIGKILL)
+                else:
+                    os.kill(pid, signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def close(self):
+        self.executor.shutdown(cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
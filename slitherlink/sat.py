@@ -0,0 +1,340 @@
+"""CNF encoding of the goal and a SAT backend (pycosat, or a bundled CDCL solver)."""
+
+try:
+    import pycosat
+except ImportError:
+    pycosat = None
+
+
+class CNF:
+    """Clause list over DIMACS variables (positive ints); edges come first."""
+
+    def __init__(self, num_vars=0):
+        self.num_vars = num_vars
+        self.clauses = []
+
+    def new_var(self):
+        self.num_vars += 1
+        return self.num_vars
+
+    def add(self, clause):
+        self.clauses.append(list(clause))
+
+    def at_most(self, lits, k):
+        # Sinz sequential counter: s[i][j] means at least j+1 of lits[:i+1] are true
+        n = len(lits)
+        if k >= n:
+            return
+        if k == 0:
+            for x in lits:
+                self.add([-x])
+            return
+
+        s = [[self.new_var() for _ in range(k)] for _ in range(n - 1)]
+        self.add([-lits[0], s[0][0]])
+        for j in range(1, k):
+            self.add([-s[0][j]])
+        for i in range(1, n - 1):
+            self.add([-lits[i], s[i][0]])
+            self.add([-s[i - 1][0], s[i][0]])
+            for j in range(1, k):
+                self.add([-lits[i], -s[i - 1][j - 1], s[i][j]])
+                self.add([-s[i - 1][j], s[i][j]])
+            self.add([-lits[i], -s[i - 1][k - 1]])
+        self.add([-lits[n - 1], -s[n - 2][k - 1]])
+
+    def at_least(self, lits, k):
+        # At least k true is at most len - k false
+        self.at_most([-x for x in lits], len(lits) - k)
+
+    def exactly(self, lits, k):
+        self.at_most(lits, k)
+        self.at_least(lits, k)
+
+    def to_dimacs(self):
+        lines = [f"p cnf {self.num_vars} {len(self.clauses)}"]
+        for clause in self.clauses:
+            lines.append(" ".join(map(str, clause)) + " 0")
+        return "\n".join(lines) + "\n"
+
+
+def encode(grid, clues):
+    """Clue and vertex constraints as CNF; edge id e is variable e + 1."""
+    cnf = CNF(grid.num_edges)
+
+    # Clue cells: exactly `count` of the 4 edges are On
+    for (r_i, c_i), count in clues.items():
+        cell_edges = grid.edges_of_cell(grid.cell(r_i, c_i))
+        cnf.exactly([e + 1 for e in cell_edges], count)
+
+    # Vertices: degree 0 or 2, i.e. at most 2 and never exactly 1
+    for p in range(grid.num_vertices):
+        lits = [e + 1 for e in grid.edges_at_vertex(p)]
+        cnf.at_most(lits, 2)
+        for x in lits:
+            cnf.add([-x] + [y for y in lits if y != x])
+
+    # Non-empty drawing
+    cnf.add(range(1, grid.num_edges + 1))
+
+    return cnf
+
+
+class CDCLSolver:
+    """Small conflict-driven clause learning solver, used when pycosat is missing.
+
+    Clauses can be added between calls to solve(); learnt clauses, variable
+    activities and saved phases carry over so each re-solve starts warm.
+    """
+
+    def __init__(self, num_vars=0):
+        self.num_vars = 0
+        self.assign = [0]  # 1 true, -1 false, 0 unassigned
+        self.level = [0]
+        self.reason = [None]
+        self.phase = [-1]
+        self.activity = [0.0]
+        self.bump = 1.0
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.watches = {}
+        self.db = []
+        self.unsat = False
+        self.decisions = 0
+        self.conflicts = 0
+        self.grow(num_vars)
+
+    def grow(self, num_vars):
+        extra = num_vars - self.num_vars
+        if extra <= 0:
+            return
+        self.assign += [0] * extra
+        self.level += [0] * extra
+        self.reason += [None] * extra
+        self.phase += [-1] * extra
+        self.activity += [0.0] * extra
+        self.num_vars = num_vars
+
+    def value(self, lit):
+        return self.assign[lit] if lit > 0 else -self.assign[-lit]
+
+    def enqueue(self, lit, why):
+        x = abs(lit)
+        self.assign[x] = 1 if lit > 0 else -1
+        self.level[x] = len(self.trail_lim)
+        self.reason[x] = why
+        self.trail.append(lit)
+
+    def attach(self, clause):
+        self.db.append(clause)
+        ci = len(self.db) - 1
+        self.watches.setdefault(clause[0], []).append(ci)
+        self.watches.setdefault(clause[1], []).append(ci)
+        return ci
+
+    def add_clause(self, clause):
+        clause = list(dict.fromkeys(clause))
+        lits = set(clause)
+        if any(-x in lits for x in clause):
+            return
+        self.grow(max(map(abs, clause), default=0))
+        self.backtrack(0)
+
+        # Watch literals that are not already false at level 0
+        clause.sort(key=lambda x: self.value(x) == -1)
+        if not clause or self.value(clause[0]) == -1:
+            self.unsat = True
+        elif len(clause) == 1 or self.value(clause[1]) == -1:
+            if self.value(clause[0]) == 0:
+                self.enqueue(clause[0], None)
+        else:
+            self.attach(clause)
+
+    def propagate(self):
+        while self.qhead < len(self.trail):
+            false_lit = -self.trail[self.qhead]
+            self.qhead += 1
+            watching = self.watches.get(false_lit, [])
+            keep = []
+            for i, ci in enumerate(watching):
+                c = self.db[ci]
+                if c[0] == false_lit:
+                    c[0], c[1] = c[1], c[0]
+                if self.value(c[0]) == 1:
+                    keep.append(ci)
+                    continue
+                for k in range(2, len(c)):
+                    if self.value(c[k]) != -1:
+                        c[1], c[k] = c[k], c[1]
+                        self.watches.setdefault(c[1], []).append(ci)
+                        break
+                else:
+                    keep.append(ci)
+                    if self.value(c[0]) == -1:
+                        keep.extend(watching[i + 1 :])
+                        self.watches[false_lit] = keep
+                        return ci
+                    self.enqueue(c[0], ci)
+            self.watches[false_lit] = keep
+        return None
+
+    def backtrack(self, to_level):
+        if len(self.trail_lim) <= to_level:
+            return
+        start = self.trail_lim[to_level]
+        for lit in self.trail[start:]:
+            x = abs(lit)
+            self.phase[x] = self.assign[x]
+            self.assign[x] = 0
+            self.reason[x] = None
+        del self.trail[start:]
+        del self.trail_lim[to_level:]
+        self.qhead = len(self.trail)
+
+    def analyze(self, confl):
+        # First unique implication point
+        learnt = [None]
+        seen = set()
+        counter = 0
+        idx = len(self.trail) - 1
+        clause = self.db[confl]
+        current = len(self.trail_lim)
+        while True:
+            for q in clause:
+                x = abs(q)
+                if x not in seen and self.level[x] > 0:
+                    seen.add(x)
+                    self.activity[x] += self.bump
+                    if self.level[x] == current:
+                        counter += 1
+                    else:
+                        learnt.append(q)
+            while abs(self.trail[idx]) not in seen:
+                idx -= 1
+            p = self.trail[idx]
+            idx -= 1
+            counter -= 1
+            if counter == 0:
+                break
+            clause = self.db[self.reason[abs(p)]]
+        learnt[0] = -p
+        if len(learnt) == 1:
+            return learnt, 0
+        # Watch the literal from the highest remaining level second
+        best = max(range(1, len(learnt)), key=lambda i: self.level[abs(learnt[i])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def solve(self):
+        """Returns the set of true variables, or None if unsatisfiable."""
+        if self.unsat:
+            return None
+        while True:
+            confl = self.propagate()
+            if confl is not None:
+                self.conflicts += 1
+                if not self.trail_lim:
+                    self.unsat = True
+                    return None
+                learnt, back_level = self.analyze(confl)
+                self.backtrack(back_level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.attach(learnt))
+                self.bump /= 0.95
+                continue
+
+            free = [x for x in range(1, self.num_vars + 1) if not self.assign[x]]
+            if not free:
+                return {x for x in range(1, self.num_vars + 1) if self.assign[x] == 1}
+            x = max(free, key=self.activity.__getitem__)
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(x if self.phase[x] == 1 else -x, None)
+
+
+def loop_components(grid, on_edges):
+    """Split the on-edge ids into connected loops using union-find over vertices."""
+    parent = list(range(grid.num_vertices))
+
+    def find(p):
+        while parent[p] != p:
+            parent[p] = parent[parent[p]]
+            p = parent[p]
+        return p
+
+    for e in on_edges:
+        parent[find(grid.edge_vertices[2 * e])] = find(grid.edge_vertices[2 * e + 1])
+
+    loops = {}
+    for e in on_edges:
+        loops.setdefault(find(grid.edge_vertices[2 * e]), set()).add(e)
+    return list(loops.values())
+
+
+def make_solver(cnf):
+    if pycosat is not None:
+        return PycosatSolver(cnf)
+    solver = CDCLSolver(cnf.num_vars)
+    for clause in cnf.clauses:
+        solver.add_clause(clause)
+    return solver
+
+
+class PycosatSolver:
+    """pycosat has no incremental interface, so re-solve from all clauses."""
+
+    def __init__(self, cnf):
+        self.clauses = [list(clause) for clause in cnf.clauses]
+
+    def add_clause(self, clause):
+        self.clauses.append(list(clause))
+
+    def solve(self):
+        result = pycosat.solve(self.clauses)
+        if result == "UNSAT":
+            return None
+        return {x for x in result if x > 0}
+
+
+def solve(grid, clues, single_loop=False, stats=None):
+    """Set of on-edge ids satisfying every clue and vertex, or None.
+
+    stats, if given, is a dict that gets "solver_calls" and "cuts" counts,
+    plus "decisions" and "conflicts" from the bundled solver.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("solver_calls", 0)
+    stats.setdefault("cuts", 0)
+
+    cnf = encode(grid, clues)
+    solver = make_solver(cnf)
+
+    while True:
+        stats["solver_calls"] += 1
+        true_vars = solver.solve()
+        if isinstance(solver, CDCLSolver):
+            stats["decisions"] = solver.decisions
+            stats["conflicts"] = solver.conflicts
+        if true_vars is None:
+            return None
+        on_edges = {e for e in range(grid.num_edges) if e + 1 in true_vars}
+        if not single_loop:
+            return on_edges
+
+        loops = loop_components(grid, on_edges)
+        if len(loops) == 1:
+            return on_edges
+
+        # Lazy subtour cuts: if every edge of a found loop is On, that loop
+        # must be the whole drawing. The aux variable is "this loop is drawn".
+        for loop in loops:
+            stats["cuts"] += 1
+            drawn = cnf.new_var()
+            solver.add_clause([drawn] + [-(e + 1) for e in loop])
+            for e in range(grid.num_edges):
+                if e not in loop:
+                    solver.add_clause([-drawn, -(e + 1)])
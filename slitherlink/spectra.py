@@ -0,0 +1,139 @@
+"""Planning with Spectra: start with every edge off, actions (Draw ?e)."""
+
+from .backtrack import ON, UNKNOWN
+from .formulas import cnf_goal, dnf_goal, off, on
+from .presolve import deduce, plan_length_bound
+from .prover import shadowprover
+
+GOALS = {"dnf": dnf_goal, "cnf": cnf_goal}
+
+
+def plan_edges(grid, plan_steps):
+    """Edge ids drawn by a plan of (Draw e) steps, in plan order."""
+    drawn = []
+    for step in plan_steps:
+        s = str(step).strip()
+        if s.startswith("(") and s.endswith(")"):
+            s = s[1:-1]
+        # (Draw e), or (Draw e n m) when the plan length is bounded
+        name, edge = s.split()[:2]
+        if name == "Draw":
+            drawn.append(grid.edge_index[edge])
+    return drawn
+
+
+def problem(grid, clues, encoding="dnf", values=None, max_steps=None):
+    """domain, background, start, goal and actions for run_spectra.
+
+    values, as from presolve.deduce, restricts the domain to the undecided
+    edges, and forced-on edges start out drawn. max_steps bounds the plan
+    length with a step counter: (Draw e n m) moves (Steps n) to (Steps m)
+    along Succ facts in the background.
+    """
+    r, _, planner, _ = shadowprover()
+
+    if values is None:
+        values = [UNKNOWN] * grid.num_edges
+    names = grid.edge_names
+    free = [names[e] for e, value in enumerate(values) if value == UNKNOWN]
+
+    domain = set(map(r, free))
+    background = set()
+    start = {
+        r(on(name) if value == ON else off(name)) for name, value in zip(names, values)
+    }
+    goal = r(GOALS[encoding](grid, clues))
+
+    if max_steps is None:
+        actions = [
+            planner.Action(
+                r("(Draw ?e)"),
+                precondition=r(off("?e")),
+                additions={r(on("?e"))},
+                deletions={r(off("?e"))},
+            )
+        ]
+        return domain, background, start, goal, actions
+
+    steps = [f"step{n}" for n in range(max_steps + 1)]
+    domain |= set(map(r, steps))
+    background |= {r(f"(Edge {name})") for name in free}
+    background |= {r(f"(Succ {n} {m})") for n, m in zip(steps, steps[1:])}
+    start.add(r(f"(Steps {steps[0]})"))
+    actions = [
+        planner.Action(
+            r("(Draw ?e ?n ?m)"),
+            precondition=r(f"(and (Edge ?e) {off('?e')} (Steps ?n) (Succ ?n ?m))"),
+            additions={r(on("?e")), r("(Steps ?m)")},
+            deletions={r(off("?e")), r("(Steps ?n)")},
+        )
+    ]
+    return domain, background, start, goal, actions
+
+
+def counting(prover, stats):
+    def _prover_(*args, **kwargs):
+        stats["prover_calls"] += 1
+        return prover(*args, **kwargs)
+
+    return _prover_
+
+
+def solve(
+    grid,
+    clues,
+    encoding="dnf",
+    verbose=False,
+    presolve=True,
+    bound_plan=False,
+    stats=None,
+):
+    """List of edge ids in the order Spectra draws them, or None.
+
+    With presolve, only edges left undecided by presolve.deduce are in the
+    planning domain; forced-on edges are part of the start state and come
+    first in the returned list. bound_plan also caps the plan length at
+    presolve.plan_length_bound, at the cost of two step arguments per
+    action. stats, if given, is a dict that gets a "prover_calls" count.
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("prover_calls", 0)
+
+    values = [UNKNOWN] * grid.num_edges
+    if presolve:
+        values = deduce(grid, clues)
+        if values is None:
+            return None
+    forced_on = [e for e, value in enumerate(values) if value == ON]
+    if UNKNOWN not in values:
+        # Solved without planning
+        return forced_on or None
+    max_steps = plan_length_bound(grid, clues, values) if bound_plan else None
+
+    _, _, planner, SST_Prover = shadowprover()
+    domain, background, start, goal, actions = problem(
+        grid, clues, encoding, values, max_steps
+    )
+
+    if verbose:
+        print("Domain", domain)
+        print("Background", background)
+        print("Start", start)
+        print("Goal", goal)
+        print("Actions", actions)
+
+    sst = SST_Prover()
+    results = planner.run_spectra(
+        domain,
+        background,
+        start,
+        goal,
+        actions,
+        counting(sst.get_cached_shadow_prover2(), stats),
+        verbose=False,
+    )
+    plan = results[0] if results else None
+    if plan is None or not (plan or forced_on):
+        return None
+    return forced_on + plan_edges(grid, plan)
@@ -0,0 +1,126 @@
+"""Rotations and reflections of a board (the dihedral group of the rectangle).
+
+A transform is (transpose, flip_rows, flip_cols), applied in that order. The
+four transforms with transpose=True turn a height x width board into a
+width x height one, so e.g. the 1x2 "3 3" and 2x1 "3/3" puzzles share one
+canonical form.
+"""
+
+from .grid import Grid
+
+IDENTITY = (False, False, False)
+TRANSFORMS = [
+    (transpose, flip_rows, flip_cols)
+    for transpose in (False, True)
+    for flip_rows in (False, True)
+    for flip_cols in (False, True)
+]
+
+
+def transformed_size(height, width, transform):
+    return (width, height) if transform[0] else (height, width)
+
+
+def map_point(r, c, max_r, max_c, transform):
+    """Move a cell or vertex; max_r/max_c are its largest row/column index."""
+    transpose, flip_rows, flip_cols = transform
+    if transpose:
+        r, c, max_r, max_c = c, r, max_c, max_r
+    if flip_rows:
+        r = max_r - r
+    if flip_cols:
+        c = max_c - c
+    return r, c
+
+
+def transform_clues(height, width, clues, transform):
+    return {
+        map_point(r, c, height - 1, width - 1, transform): k
+        for (r, c), k in clues.items()
+    }
+
+
+def edge_permutation(grid, transform, target=None):
+    """perm[e] is the id of edge e on the transformed board (target Grid)."""
+    if target is None:
+        target = Grid(*transformed_size(grid.height, grid.width, transform))
+    target_edges = {}
+    for e in range(target.num_edges):
+        a, b = target.edge_vertices[2 * e], target.edge_vertices[2 * e + 1]
+        target_edges[(min(a, b), max(a, b))] = e
+
+    cols = grid.width + 1
+    perm = []
+    for e in range(grid.num_edges):
+        ends = []
+        for p in (grid.edge_vertices[2 * e], grid.edge_vertices[2 * e + 1]):
+            r, c = map_point(p // cols, p % cols, grid.height, grid.width, transform)
+            ends.append(target.vertex(r, c))
+        perm.append(target_edges[(min(ends), max(ends))])
+    return perm
+
+
+def canonicalize(height, width, clues):
+    """(height, width, clues, transform) of the lexicographically smallest image."""
+    best = None
+    for transform in TRANSFORMS:
+        size = transformed_size(height, width, transform)
+        moved = transform_clues(height, width, clues, transform)
+        key = (size, sorted(moved.items()))
+        if best is None or key < best[0]:
+            best = (key, size, moved, transform)
+    _, (canon_height, canon_width), canon_clues, transform = best
+    return canon_height, canon_width, canon_clues, transform
+
+
+def edges_to_original(grid, transform, canonical_edges, canonical_grid=None):
+    """Map on-edge ids found on the canonical board back onto grid."""
+    perm = edge_permutation(grid, transform, canonical_grid)
+    inverse = {new: old for old, new in enumerate(perm)}
+    return {inverse[e] for e in canonical_edges}
+
+
+def automorphisms(grid, clues):
+    """Edge permutations of the non-identity symmetries that map the board and
+    its clues onto themselves."""
+    perms = []
+    for transform in TRANSFORMS:
+        if transform == IDENTITY:
+            continue
+        if transformed_size(grid.height, grid.width, transform) != (
+            grid.height,
+            grid.width,
+        ):
+            continue
+        if transform_clues(grid.height, grid.width, clues, transform) != clues:
+            continue
+        perms.append(edge_permutation(grid, transform, grid))
+    return perms
+
+
+def permute_mask(mask, perm):
+    image = 0
+    while mask:
+        low = mask & -mask
+        image |= 1 << perm[low.bit_length() - 1]
+        mask ^= low
+    return image
+
+
+def mask_permuter(perm):
+    """Fast permute_mask for one perm, via a lookup table per byte of the mask."""
+    tables = []
+    for start in range(0, len(perm), 8):
+        chunk = perm[start : start + 8]
+        tables.append(
+            [permute_mask(byte, chunk) for byte in range(1 << len(chunk))]
+        )
+
+    def permute(mask):
+        image = 0
+        for table in tables:
+            image |= table[mask & 0xFF]
+            mask >>= 8
+        return image
+
+    return permute
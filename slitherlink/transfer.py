@@ -0,0 +1,170 @@
+"""Row-by-row transfer-matrix DP: exact solution counts and uniform samples.
+
+With several loops allowed every constraint is local, so a drawing can be
+built one vertex row at a time. A state is (verticals coming down into the
+vertex row, bottom edges the clue cells just above still need) as two
+bitmasks; layer r holds the states reachable before vertex row r with their
+number of ways. Work is linear in the height and exponential only in the
+width.
+"""
+
+import random
+from functools import lru_cache
+
+# State with no verticals pending and nothing needed, at both ends of the DP
+EMPTY = (0, 0)
+
+
+@lru_cache(maxsize=None)
+def row_transitions(width, vup, last):
+    """(horizontals, verticals going down) bitmasks for one vertex row, given
+    the verticals vup coming in from above, with every vertex at degree 0 or
+    2. The last row has nothing below it."""
+    rows = []
+
+    def extend(c, left, hmask, vdown):
+        if c > width:
+            rows.append((hmask, vdown))
+            return
+        up = vup >> c & 1
+        for right in (0, 1) if c < width else (0,):
+            for down in (0,) if last else (0, 1):
+                if up + left + right + down in (0, 2):
+                    extend(c + 1, right, hmask | right << c, vdown | down << c)
+
+    extend(0, 0, 0, 0)
+    return tuple(rows)
+
+
+def stepper(grid, clues):
+    """successors(r, state) yielding (hmask, vdown, next state) for the
+    drawings of vertex row r that fit the clues of the cells on both sides."""
+    height, width = grid.height, grid.width
+    care = [0] * height
+    row_clues = [[] for _ in range(height)]
+    for (r, c), count in clues.items():
+        care[r] |= 1 << c
+        row_clues[r].append((c, count))
+
+    def successors(r, state):
+        vup, need = state
+        last = r == height
+        care_above = care[r - 1] if r else 0
+        for hmask, vdown in row_transitions(width, vup, last):
+            if hmask & care_above != need:
+                continue
+            if last:
+                yield hmask, vdown, EMPTY
+                continue
+            # Bottom edges the clue cells of row r need from the next row
+            next_need = 0
+            for c, count in row_clues[r]:
+                rest = count - (hmask >> c & 1) - (vdown >> c & 1)
+                rest -= vdown >> (c + 1) & 1
+                if rest not in (0, 1):
+                    break
+                next_need |= rest << c
+            else:
+                yield hmask, vdown, (vdown, next_need)
+
+    return successors
+
+
+def forward(grid, clues):
+    """layers[r]: state -> number of partial drawings of vertex rows < r.
+
+    layers[height + 1] is {EMPTY: number of drawings} when any exist.
+    """
+    successors = stepper(grid, clues)
+    layers = [{EMPTY: 1}]
+    for r in range(grid.height + 1):
+        layer = {}
+        for state, ways in layers[-1].items():
+            for _, _, next_state in successors(r, state):
+                layer[next_state] = layer.get(next_state, 0) + ways
+        layers.append(layer)
+    return layers
+
+
+def empty_drawing_fits(clues):
+    return not any(clues.values())
+
+
+def count_solutions(grid, clues):
+    """Exact number of non-empty solutions."""
+    total = forward(grid, clues)[-1].get(EMPTY, 0)
+    return total - empty_drawing_fits(clues)
+
+
+def backward(grid, clues, layers):
+    """ways[r]: state -> number of completions from that state in layers[r]."""
+    successors = stepper(grid, clues)
+    ways = [{} for _ in layers]
+    ways[-1] = {EMPTY: 1} if EMPTY in layers[-1] else {}
+    for r in range(grid.height, -1, -1):
+        after = ways[r + 1]
+        for state in layers[r]:
+            total = sum(after.get(t, 0) for _, _, t in successors(r, state))
+            if total:
+                ways[r][state] = total
+    return ways
+
+
+def walk(grid, clues, choose, layers=None):
+    """On-edge ids of one non-empty solution, or None.
+
+    Walks down the rows choosing among (weight, hmask, vdown, next state)
+    options with choose(options), where weight counts the non-empty
+    solutions through that option. layers is forward(grid, clues) if
+    already computed.
+    """
+    successors = stepper(grid, clues)
+    if layers is None:
+        layers = forward(grid, clues)
+    ways = backward(grid, clues, layers)
+    empty_fits = empty_drawing_fits(clues)
+
+    on_edges = set()
+    state = EMPTY
+    for r in range(grid.height + 1):
+        options = []
+        for hmask, vdown, next_state in successors(r, state):
+            weight = ways[r + 1].get(next_state, 0)
+            if empty_fits and not (on_edges or hmask or vdown):
+                # Leave out the drawing with no edges at all
+                weight -= 1
+            if weight > 0:
+                options.append((weight, hmask, vdown, next_state))
+        if not options:
+            return None
+        _, hmask, vdown, state = choose(options)
+        on_edges.update(grid.h(r, c) for c in range(grid.width) if hmask >> c & 1)
+        on_edges.update(grid.v(r, c) for c in range(grid.width + 1) if vdown >> c & 1)
+    return on_edges
+
+
+def sample(grid, clues, rng=random):
+    """A uniformly random non-empty solution as a set of on-edge ids, or None."""
+
+    def choose(options):
+        pick = rng.randrange(sum(option[0] for option in options))
+        for option in options:
+            pick -= option[0]
+            if pick < 0:
+                return option
+
+    return walk(grid, clues, choose)
+
+
+def solve(grid, clues, stats=None):
+    """Set of on-edge ids of one solution, or None.
+
+    stats, if given, is a dict that gets a "states" count (DP states over
+    all layers).
+    """
+    if stats is None:
+        stats = {}
+    stats.setdefault("states", 0)
+    layers = forward(grid, clues)
+    stats["states"] += sum(map(len, layers))
+    return walk(grid, clues, lambda options: options[0], layers)
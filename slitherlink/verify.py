@@ -0,0 +1,183 @@
+"""Vectorized checking of many candidate solutions at once with NumPy.
+
+    python -m slitherlink.verify submissions.jsonl -o graded.jsonl
+
+Each input line is a puzzle plus the submitted edges,
+
+    {"id": "s1", "height": 2, "width": 2, "clues": [[0, 0, 3]], "edges": ["h_0_0", ...]}
+
+and each output line is {"id": ..., "valid": true/false}, plus an "error"
+for a line that could not be read. Boards of one size
+are checked together: clues as an int8 array (boards, height, width) with -1
+for empty cells, edges as a bool array (boards, num_edges) or as bits packed
+little-endian along the edge axis, so bit e of a board's row is edge id e
+like the engines' bitmask states.
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict
+
+import numpy as np
+
+from .grid import Grid, parse_puzzle
+
+
+def pack_clues(grid, clue_dicts):
+    """(boards, height, width) int8 clue array, -1 where there is no clue."""
+    packed = np.full((len(clue_dicts), grid.height, grid.width), -1, np.int8)
+    for b, clues in enumerate(clue_dicts):
+        for (r, c), count in clues.items():
+            packed[b, r, c] = count
+    return packed
+
+
+def pack_edges(grid, edge_sets):
+    """(boards, ceil(num_edges / 8)) uint8 array of on-edge bits."""
+    edges = np.zeros((len(edge_sets), grid.num_edges), bool)
+    for b, on_edges in enumerate(edge_sets):
+        edges[b, list(on_edges)] = True
+    return np.packbits(edges, axis=1, bitorder="little")
+
+
+def unpack_edges(grid, edges):
+    """Bool (boards, num_edges) view of an edges array, packed or not."""
+    edges = np.asarray(edges)
+    if edges.dtype == np.uint8 and edges.shape[1] != grid.num_edges:
+        return np.unpackbits(edges, axis=1, count=grid.num_edges, bitorder="little")
+    return edges.astype(bool, copy=False)
+
+
+def incidence(grid):
+    """(cells, 4) edge ids per cell, and (vertices, 4) edge ids and
+    neighbouring vertex ids per vertex. Missing entries point at an extra
+    edge num_edges that is always off."""
+    cell_edges = np.frombuffer(grid.cell_edges, np.int32).reshape(-1, 4)
+    vertex_edges = np.full((grid.num_vertices, 4), grid.num_edges, np.intp)
+    neighbours = np.zeros((grid.num_vertices, 4), np.intp)
+    for p in range(grid.num_vertices):
+        for k, e in enumerate(grid.edges_at_vertex(p)):
+            u, v = grid.edge_vertices[2 * e], grid.edge_vertices[2 * e + 1]
+            vertex_edges[p, k] = e
+            neighbours[p, k] = v if u == p else u
+    return cell_edges, vertex_edges, neighbours
+
+
+def single_loop(grid, edges, vertex_edges, neighbours):
+    """Whether each board's drawn vertices form one connected component,
+    by propagating the smallest vertex id along drawn edges."""
+    boards = edges.shape[0]
+    drawn = np.concatenate([edges, np.zeros((boards, 1), bool)], axis=1)
+    incident = drawn[:, vertex_edges]
+    active = incident.any(axis=2)
+
+    unset = grid.num_vertices
+    labels = np.where(active, np.arange(grid.num_vertices), unset)
+    while True:
+        spread = np.where(incident, labels[:, neighbours], unset).min(axis=2)
+        updated = np.minimum(labels, spread)
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+    return ((labels == labels.min(axis=1, keepdims=True)) | ~active).all(axis=1)
+
+
+def check(grid, clues, edges, connected=False):
+    """Bool array with one entry per board: every clue count is exact, every
+    vertex has degree 0 or 2 and at least one edge is drawn. connected also
+    requires a single loop, as in standard Slitherlink."""
+    edges = unpack_edges(grid, edges)
+    clues = np.asarray(clues).reshape(len(edges), -1)
+    cell_edges, vertex_edges, neighbours = incidence(grid)
+
+    counts = edges[:, cell_edges].sum(axis=2)
+    clues_ok = ((clues < 0) | (counts == clues)).all(axis=1)
+
+    padded = np.concatenate([edges, np.zeros((len(edges), 1), bool)], axis=1)
+    degrees = padded[:, vertex_edges].sum(axis=2)
+    degrees_ok = ((degrees == 0) | (degrees == 2)).all(axis=1)
+
+    ok = clues_ok & degrees_ok & edges.any(axis=1)
+    if connected and ok.any():
+        ok[ok] = single_loop(grid, edges[ok], vertex_edges, neighbours)
+    return ok
+
+
+def grade(submissions, connected=False):
+    """Yield {"id", "valid"} records for submission dicts, checking each
+    board size as one batch. Submissions that could not be read (see
+    read_submissions) are invalid and also get their "error"."""
+    by_size = defaultdict(list)
+    for submission in submissions:
+        if "error" in submission:
+            yield {"id": submission["id"], "valid": False, "error": submission["error"]}
+            continue
+        by_size[submission["height"], submission["width"]].append(submission)
+
+    for (height, width), batch in by_size.items():
+        grid = Grid(height, width)
+        valid = check(
+            grid,
+            pack_clues(grid, [s["clues"] for s in batch]),
+            pack_edges(grid, [s["edges"] for s in batch]),
+            connected,
+        )
+        for submission, ok in zip(batch, valid):
+            yield {"id": submission["id"], "valid": bool(ok)}
+
+
+def read_submissions(lines):
+    """Submission dicts from JSONL lines. Submissions are untrusted, so a
+    line that cannot be read (bad JSON, a clue off the board, an unknown
+    edge name, ...) becomes {"id", "error"} instead of stopping the file."""
+    grids = {}
+    for n, line in enumerate(lines):
+        line = line.strip()
+        if not line:
+            continue
+        submission_id = n
+        try:
+            data = json.loads(line)
+            submission_id = data.get("id", n)
+            height, width, clues = parse_puzzle(data)
+            size = height, width
+            if size not in grids:
+                grids[size] = Grid(*size)
+            grid = grids[size]
+            edges = [grid.edge_index[name] for name in data["edges"]]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            yield {"id": submission_id, "error": f"{type(e).__name__}: {e}"}
+            continue
+        yield {
+            "id": submission_id,
+            "height": size[0],
+            "width": size[1],
+            "clues": clues,
+            "edges": edges,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m slitherlink.verify")
+    parser.add_argument("submissions", help="JSONL file of puzzles with edges")
+    parser.add_argument("--output", "-o", help="results file (default stdout)")
+    parser.add_argument(
+        "--single-loop", action="store_true", help="also require one connected loop"
+    )
+    args = parser.parse_args(argv)
+
+    with open(args.submissions) as f:
+        submissions = list(read_submissions(f))
+
+    out = open(args.output, "w") if args.output else sys.stdout
+    try:
+        for result in grade(submissions, args.single_loop):
+            out.write(json.dumps(result) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
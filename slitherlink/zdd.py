@@ -0,0 +1,268 @@
+"""Zero-suppressed decision diagram (ZDD) of a puzzle's whole solution set.
+
+The diagram is built top-down with the frontier method: edges are decided
+in a fixed order, and the nodes of one level are the distinct On counts of
+the clue cells and vertices that are partly decided at that point. A
+constraint is checked and dropped once its last edge is decided, so the
+state stays as small as the frontier. Solutions share structure, and
+counting, uniform sampling and intersection run in time proportional to the
+diagram size.
+"""
+
+import random
+
+from .backtrack import sweep_order
+
+
+def local_constraints(grid, clues):
+    """(edge ids, allowed On counts) for every clue cell and vertex."""
+    constraints = [
+        (list(grid.edges_of_cell(grid.cell(r, c))), (count,))
+        for (r, c), count in clues.items()
+    ]
+    constraints.extend(
+        (list(grid.edges_at_vertex(p)), (0, 2)) for p in range(grid.num_vertices)
+    )
+    return constraints
+
+
+class ZDD:
+    """A family of edge sets over order, as a reduced, shared node table.
+
+    Node 0 is the empty family and node 1 the family holding only the empty
+    set. Every other node n decides edge order[var[n]]: lo[n] is the family
+    without it and hi[n] the family with it. Children always have smaller
+    ids than their parents.
+    """
+
+    __slots__ = ("order", "var", "lo", "hi", "unique", "root")
+
+    def __init__(self, order, root=0):
+        self.order = list(order)
+        terminal = len(self.order)
+        self.var = [terminal, terminal]
+        self.lo = [0, 1]
+        self.hi = [0, 1]
+        self.unique = {}
+        self.root = root
+
+    def node(self, var, lo, hi):
+        if hi == 0:
+            return lo
+        key = (var, lo, hi)
+        n = self.unique.get(key)
+        if n is None:
+            n = len(self.var)
+            self.var.append(var)
+            self.lo.append(lo)
+            self.hi.append(hi)
+            self.unique[key] = n
+        return n
+
+    def reachable(self):
+        """Node ids reachable from the root, in increasing order."""
+        seen = {self.root}
+        stack = [self.root]
+        while stack:
+            n = stack.pop()
+            if n > 1:
+                for child in (self.lo[n], self.hi[n]):
+                    if child not in seen:
+                        seen.add(child)
+                        stack.append(child)
+        return sorted(seen)
+
+    def size(self):
+        """Number of non-terminal nodes in the diagram."""
+        return sum(1 for n in self.reachable() if n > 1)
+
+    def counts(self):
+        """Number of sets below each reachable node."""
+        counts = {0: 0, 1: 1}
+        for n in self.reachable():
+            if n > 1:
+                counts[n] = counts[self.lo[n]] + counts[self.hi[n]]
+        return counts
+
+    def count(self):
+        return self.counts()[self.root]
+
+    def sample(self, rng=random):
+        """A uniformly random member as a set of edge ids, or None if empty."""
+        counts = self.counts()
+        n = self.root
+        if counts[n] == 0:
+            return None
+        chosen = set()
+        while n > 1:
+            if rng.randrange(counts[n]) < counts[self.hi[n]]:
+                chosen.add(self.order[self.var[n]])
+                n = self.hi[n]
+            else:
+                n = self.lo[n]
+        return chosen
+
+    def __iter__(self):
+        # Depth-first over (node, edges chosen on the way)
+        stack = [(self.root, ())]
+        while stack:
+            n, chosen = stack.pop()
+            if n == 1:
+                yield set(chosen)
+            elif n > 1:
+                stack.append((self.lo[n], chosen))
+                stack.append((self.hi[n], chosen + (self.order[self.var[n]],)))
+
+    def without_empty(self):
+        """The same family minus the empty set, sharing this node table."""
+        result = ZDD(self.order)
+        result.var, result.lo, result.hi = self.var, self.lo, self.hi
+        result.unique = self.unique
+        # The empty set is the path of lo edges from the root; rebuild it
+        # ending in 0 instead of 1
+        path = []
+        n = self.root
+        while n > 1:
+            path.append(n)
+            n = self.lo[n]
+        n = 0
+        for parent in reversed(path):
+            n = result.node(self.var[parent], n, self.hi[parent])
+        result.root = n
+        return result
+
+    def intersect(self, other):
+        """ZDD of the sets in both families; both must share the same order."""
+        if other.order != self.order:
+            raise ValueError("ZDDs must use the same edge order to intersect")
+        result = ZDD(self.order)
+        done = {}
+        stack = [(self.root, other.root)]
+        while stack:
+            f, g = pair = stack[-1]
+            if pair in done:
+                stack.pop()
+                continue
+            if f == 0 or g == 0:
+                done[pair] = 0
+                stack.pop()
+                continue
+            if f == 1 and g == 1:
+                done[pair] = 1
+                stack.pop()
+                continue
+
+            vf, vg = self.var[f], other.var[g]
+            if vf < vg:
+                # g never holds edge vf, so only f's lo branch can match
+                parts = [(self.lo[f], g)]
+            elif vf > vg:
+                parts = [(f, other.lo[g])]
+            else:
+                parts = [(self.lo[f], other.lo[g]), (self.hi[f], other.hi[g])]
+            missing = [part for part in parts if part not in done]
+            if missing:
+                stack.extend(missing)
+                continue
+
+            stack.pop()
+            if len(parts) == 1:
+                done[pair] = done[parts[0]]
+            else:
+                done[pair] = result.node(vf, done[parts[0]], done[parts[1]])
+        result.root = done[(self.root, other.root)]
+        return result
+
+    def constrain(self, grid, constraints):
+        """Members that also meet constraints, a list of (edge ids, allowed
+        On counts) pairs, without rebuilding the diagram from the clues."""
+        return self.intersect(build(grid, constraints, self.order))
+
+
+def build(grid, constraints, order=None):
+    """ZDD of every edge set meeting constraints, deciding edges in order.
+
+    The default order sweeps the board row by row (see
+    backtrack.sweep_order), which keeps the frontier one row wide; the
+    all-horizontals-then-verticals id order would keep every vertex open.
+    """
+    if order is None:
+        order = sweep_order(grid)
+    level_of = {e: i for i, e in enumerate(order)}
+    first = []
+    final = []
+    for edge_ids, _ in constraints:
+        levels = [level_of[e] for e in edge_ids]
+        first.append(min(levels))
+        final.append(max(levels))
+
+    # A state is the tuple of On counts of the constraints open between two
+    # levels, in a fixed order. At each level the counts are laid out as the
+    # open ones followed by those starting there. The ones this edge touches
+    # go up if it is drawn and must still be able to reach an allowed count
+    # with the edges they have left; the rest are carried over unchanged.
+    steps = []
+    open_before = []
+    for level in range(len(order)):
+        starting = [ci for ci in range(len(constraints)) if first[ci] == level]
+        work = open_before + starting
+        checks = []
+        for j, ci in enumerate(work):
+            edge_ids, allowed = constraints[ci]
+            if order[level] in edge_ids:
+                left = sum(level_of[e] > level for e in edge_ids)
+                reachable = {
+                    c
+                    for c in range(len(edge_ids) + 1)
+                    if any(c <= k <= c + left for k in allowed)
+                }
+                checks.append((j, reachable))
+        keep = [j for j, ci in enumerate(work) if final[ci] > level]
+        steps.append((len(starting), checks, keep))
+        open_before = [work[j] for j in keep]
+
+    # Top-down: the states of each level and their (lo, hi) children, with
+    # the ints 0 and 1 standing for the terminals
+    last = len(order) - 1
+    layer = {(): None}
+    children = []
+    for level, (starting, checks, keep) in enumerate(steps):
+        next_layer = {}
+        kids = {}
+        for state in layer:
+            pair = []
+            for drawn in (0, 1):
+                work = list(state) + [0] * starting
+                ok = True
+                for j, reachable in checks:
+                    work[j] += drawn
+                    ok = ok and work[j] in reachable
+                if not ok:
+                    pair.append(0)
+                elif level == last:
+                    pair.append(1)
+                else:
+                    child = tuple([work[j] for j in keep])
+                    next_layer[child] = None
+                    pair.append(child)
+            kids[state] = pair
+        children.append(kids)
+        layer = next_layer
+
+    # Bottom-up: reduce and share nodes level by level
+    zdd = ZDD(order)
+    ids = {}
+    for level in range(last, -1, -1):
+        level_ids = {}
+        for state, (lo, hi) in children[level].items():
+            lo = lo if isinstance(lo, int) else ids[lo]
+            hi = hi if isinstance(hi, int) else ids[hi]
+            level_ids[state] = zdd.node(level, lo, hi)
+        ids = level_ids
+    zdd.root = ids[()]
+    return zdd
+
+
+def solutions(grid, clues, order=None):
+    """ZDD of every non-empty solution of the clues."""
+    return build(grid, local_constraints(grid, clues), order).without_empty()
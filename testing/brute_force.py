@@ -0,0 +1,159 @@
+"""Cross-check the engines against brute force on small random boards.
+
+    python testing/brute_force.py --boards 200 --seed 0
+
+Every edge subset of each board is tried to get the exact solution set,
+which presolve, the BFS variants, backtrack, transfer, the ZDD, SAT and
+verify must all agree with. ShadowProver is not needed; the prover-backed
+goal checks are not covered.
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slitherlink import backtrack, bfs, presolve, sat, transfer, verify, zdd
+from slitherlink.backtrack import OFF, ON
+from slitherlink.grid import Grid
+
+BFS_VARIANTS = [
+    {},
+    {"presolve": False},
+    {"presolve": False, "prune": False},
+    {"break_symmetry": True},
+    {"best_first": True},
+    {"presolve": False, "best_first": True},
+]
+
+
+def random_board(rng, max_height=2, max_width=3):
+    height = rng.randint(1, max_height)
+    width = rng.randint(1, max_width)
+    clues = {
+        (r, c): rng.randint(0, 4)
+        for r in range(height)
+        for c in range(width)
+        if rng.random() < 0.5
+    }
+    return Grid(height, width), clues
+
+
+def local_masks(grid, clues):
+    # Vertices first: they rule out most subsets fastest
+    masks = [
+        (grid.edge_mask(grid.edges_at_vertex(p)), (0, 2))
+        for p in range(grid.num_vertices)
+    ]
+    masks.extend(
+        (grid.edge_mask(grid.edges_of_cell(grid.cell(r, c))), (count,))
+        for (r, c), count in clues.items()
+    )
+    return masks
+
+
+def fits(mask, masks):
+    return all((mask & m).bit_count() in allowed for m, allowed in masks)
+
+
+def brute_force(grid, clues):
+    """Every non-empty solution as a bitmask."""
+    masks = local_masks(grid, clues)
+    return [m for m in range(1, 1 << grid.num_edges) if fits(m, masks)]
+
+
+def check_board(grid, clues, rng):
+    masks = local_masks(grid, clues)
+    solutions = brute_force(grid, clues)
+    shortest = min((m.bit_count() for m in solutions), default=None)
+
+    def is_solution(on_edges):
+        return bool(on_edges) and fits(grid.edge_mask(on_edges), masks)
+
+    values = presolve.deduce(grid, clues)
+    if values is None:
+        assert not solutions, "presolve rejected a solvable board"
+    else:
+        for m in solutions:
+            for e, value in enumerate(values):
+                assert value not in (ON, OFF) or (m >> e & 1) == (value == ON), (
+                    f"presolve fixed edge {grid.edge_names[e]} against a solution"
+                )
+            forced = sum(value == ON for value in values)
+            bound = presolve.plan_length_bound(grid, clues, values)
+            assert m.bit_count() - forced <= bound, "plan_length_bound too small"
+
+    for options in BFS_VARIANTS:
+        plan = bfs.solve(grid, clues, **options)
+        if solutions:
+            assert is_solution(plan), f"bfs {options} gave a non-solution"
+            assert len(plan) == shortest, f"bfs {options} plan is not shortest"
+        else:
+            assert plan is None, f"bfs {options} solved an unsolvable board"
+
+    for name, solve in [
+        ("backtrack", backtrack.solve),
+        ("transfer", transfer.solve),
+        ("sat", sat.solve),
+    ]:
+        on_edges = solve(grid, clues)
+        if solutions:
+            assert is_solution(on_edges), f"{name} gave a non-solution"
+        else:
+            assert not on_edges, f"{name} solved an unsolvable board"
+
+    count = len(solutions)
+    assert backtrack.count_solutions(grid, clues) == count, "backtrack count"
+    assert backtrack.count_solutions(grid, clues, 2) == min(count, 2), "limit=2"
+    assert backtrack.is_unique(grid, clues) == (count == 1), "is_unique"
+    assert transfer.count_solutions(grid, clues) == count, "transfer count"
+    if solutions:
+        assert is_solution(transfer.sample(grid, clues, rng)), "transfer sample"
+
+    diagram = zdd.solutions(grid, clues)
+    assert diagram.count() == count, "zdd count"
+    assert sorted(grid.edge_mask(s) for s in diagram) == solutions, "zdd members"
+    if solutions:
+        assert is_solution(diagram.sample(rng)), "zdd sample"
+
+    # verify.check against the brute-force predicate, on every solution plus
+    # random edge sets
+    candidates = solutions + [
+        rng.randrange(1 << grid.num_edges) for _ in range(len(solutions) + 8)
+    ]
+    graded = verify.check(
+        grid,
+        verify.pack_clues(grid, [clues] * len(candidates)),
+        verify.pack_edges(grid, [grid.edges_of_mask(m) for m in candidates]),
+    )
+    for m, ok in zip(candidates, graded):
+        assert bool(ok) == (m != 0 and fits(m, masks)), "verify.check"
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boards", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    start_time = time.perf_counter()
+    solvable = 0
+    for n in range(args.boards):
+        grid, clues = random_board(rng)
+        try:
+            solvable += check_board(grid, clues, rng) > 0
+        except AssertionError as e:
+            sys.exit(f"Board {n}: {grid!r} {clues}: {e}")
+    print(
+        f"{args.boards} boards ({solvable} solvable) agree with brute force "
+        f"in {time.perf_counter() - start_time:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()